@@ -1,20 +1,30 @@
 ﻿from __future__ import annotations
 
 import asyncio
+import hashlib
 import importlib
+import json
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Any, Awaitable, Callable
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
 
 import discord
 from discord import app_commands
 from loguru import logger
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from .db import crud
 from .db.session import create_sessionmaker, init_db
+from .db.writer import MessageMapWriter
 from .exceptions import ConfigError, ScribeError
+from .services.config_cache import ChannelConfigCache
+from .services.glossary import GlossaryCache
 from .services.metrics import MetricsRegistry
 from .services.translator.base import TranslatorRegistry
 
+if TYPE_CHECKING:
+    from worker import TranslationWorker
+
 SetupFunc = Callable[["ScribeBot"], Awaitable[None]]
 
 
@@ -38,50 +48,88 @@ class ScribeBot(discord.Client):
         self.settings = settings
         self.tree = app_commands.CommandTree(self)
         self.metrics = MetricsRegistry()
+        self.config_cache: ChannelConfigCache[Any] = ChannelConfigCache()
+        self.glossary_cache = GlossaryCache()
         self.translators = TranslatorRegistry(settings)
-        self._sessionmaker = create_sessionmaker(settings.database_path)
+        self._sessionmaker: async_sessionmaker | None = None
+        self.message_map_writer: MessageMapWriter | None = None
+        self.worker: TranslationWorker | None = None
         self.context = BotContext(
             translator_registry=self.translators,
             metrics=self.metrics,
         )
-        self.start_time = datetime.now(timezone.utc)
+        self.start_time = discord.utils.utcnow()
         self._command_synced = asyncio.Event()
 
     @property
-    def sessionmaker(self):  # type: ignore[override]
+    def sessionmaker(self) -> async_sessionmaker:  # type: ignore[override]
+        if self._sessionmaker is None:
+            raise RuntimeError("Sessionmaker has not been initialized.")
         return self._sessionmaker
 
     async def setup_hook(self) -> None:
+        self._sessionmaker = await asyncio.to_thread(
+            create_sessionmaker,
+            self.settings.database_path,
+            echo=self.settings.database_echo,
+        )
         await init_db(self._sessionmaker)
+        self.message_map_writer = MessageMapWriter(self._sessionmaker)
+        self.message_map_writer.start()
         await self._load_cogs()
-        await self._sync_commands()
+        await self.sync_commands(force=self.settings.force_command_sync)
         self._command_synced.set()
 
     async def _load_cogs(self) -> None:
-        for module_name in (
+        module_names = (
             "bot.cogs.user",
             "bot.cogs.admin",
             "bot.cogs.listeners",
-        ):
-            await self._import_and_setup(module_name)
+        )
+        logger.debug("Loading cog modules {}", ", ".join(module_names))
+        modules = await asyncio.gather(
+            *(asyncio.to_thread(importlib.import_module, module_name) for module_name in module_names)
+        )
+        await asyncio.gather(*(self._setup_module(module) for module in modules))
 
-    async def _import_and_setup(self, module_name: str) -> None:
-        logger.debug("Loading cog module {}", module_name)
-        module = importlib.import_module(module_name)
+    async def _setup_module(self, module: ModuleType) -> None:
         if not hasattr(module, "setup"):
-            raise ConfigError(f"Cog module {module_name} is missing setup()")
+            raise ConfigError(f"Cog module {module.__name__} is missing setup()")
         setup_func: SetupFunc = getattr(module, "setup")
         await setup_func(self)
 
-    async def _sync_commands(self) -> None:
+    def _command_tree_hash(self, guild: discord.abc.Snowflake | None) -> str:
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands(guild=guild)]
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    async def sync_commands(self, *, force: bool = False) -> bool:
+        """Sync the command tree, skipping the API call when it is unchanged since the last sync."""
         guild = None
         if self.settings.discord_guild_test_id:
             guild = discord.Object(id=self.settings.discord_guild_test_id)
-        await self.tree.sync(guild=guild)
+        meta_key = f"command_tree_hash:{guild.id if guild else 'global'}"
+        digest = self._command_tree_hash(guild)
+        async with self.sessionmaker() as session:
+            if not force and await crud.get_bot_meta(session, meta_key) == digest:
+                logger.info("Command tree unchanged; skipping sync")
+                return False
+            await self.tree.sync(guild=guild)
+            await crud.set_bot_meta(session, meta_key, digest)
         if guild:
             logger.info("Synced commands to test guild {}", guild.id)
         else:
             logger.info("Synced commands globally (may take up to 1 hour)")
+        return True
+
+    async def close(self) -> None:
+        # Stop the workers first so nothing enqueues rows after the writer has drained.
+        if self.worker is not None:
+            await self.worker.close()
+        if self.message_map_writer is not None:
+            await self.message_map_writer.close()
+        await self.translators.aclose()
+        await super().close()
 
     async def on_ready(self) -> None:
         logger.info("Logged in as {} (id={})", self.user, getattr(self.user, "id", None))
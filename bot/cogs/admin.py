@@ -1,6 +1,6 @@
 ﻿from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, Sequence
 
 import discord
 from discord import app_commands
@@ -19,17 +19,37 @@ def guild_admin_check(interaction: discord.Interaction) -> bool:
     raise app_commands.CheckFailure("Manage Guild permission required.")
 
 
+async def bot_owner_check(interaction: discord.Interaction[ScribeBot]) -> bool:
+    app_info = await interaction.client.application_info()
+    if app_info.team:
+        owner_ids = {member.id for member in app_info.team.members}
+    else:
+        owner_ids = {app_info.owner.id}
+    if interaction.user.id in owner_ids:
+        return True
+    raise app_commands.CheckFailure("Only the bot owner can do that.")
+
+
 admin_group = app_commands.Group(name="admin", description="Administrative commands")
 channel_group = app_commands.Group(name="channel", description="Channel configuration")
 admin_group.add_command(channel_group)
 
 
-def _render_glossary(entries: list[GlossaryEntry]) -> str:
+_GLOSSARY_LINE = "• `{0}` → `{1}`".format
+_GLOSSARY_LINE_WITH_CONTEXT = "• `{0}` → `{1}` _(ctx: {2})_".format
+_USAGE_LINE = "\n• {0}: {1} chars, ${2:.4f}".format
+
+
+def _render_glossary(entries: Sequence[GlossaryEntry]) -> str:
     if not entries:
         return "(empty)"
     return "\n".join(
-        f"• `{entry.term}` → `{entry.translation}`" + (f" _(ctx: {entry.context})_" if entry.context else "")
-        for entry in entries
+        [
+            _GLOSSARY_LINE_WITH_CONTEXT(entry.term, entry.translation, entry.context)
+            if entry.context
+            else _GLOSSARY_LINE(entry.term, entry.translation)
+            for entry in entries
+        ]
     )
 
 
@@ -37,36 +57,45 @@ def _render_glossary(entries: list[GlossaryEntry]) -> str:
 @app_commands.describe(lang="ISO language code (en, es, fr, ...)")
 @app_commands.check(guild_admin_check)
 async def set_guild_default(interaction: discord.Interaction[ScribeBot], lang: str) -> None:
+    guild_id = interaction.guild_id
+    assert guild_id is not None
     lang = lang.lower()
     if not validate_language_code(lang):
         await interaction.response.send_message("Unsupported language code", ephemeral=True)
         return
     async with interaction.client.sessionmaker() as session:
-        await crud.update_guild_settings(session, interaction.guild_id, default_lang=lang)
+        await crud.update_guild_settings(session, guild_id, default_lang=lang)
+    interaction.client.config_cache.invalidate_guild(guild_id)
     await interaction.response.send_message(f"Guild default language set to `{lang}`.", ephemeral=True)
 
 
 @channel_group.command(name="enable", description="Enable Scribe in this channel")
 @app_commands.check(guild_admin_check)
 async def channel_enable(interaction: discord.Interaction[ScribeBot]) -> None:
+    guild_id = interaction.guild_id
+    assert guild_id is not None
     channel = interaction.channel
     if not isinstance(channel, discord.TextChannel):
         await interaction.response.send_message("Only text channels are supported.", ephemeral=True)
         return
     async with interaction.client.sessionmaker() as session:
-        await crud.upsert_channel_override(session, guild_id=interaction.guild_id, channel_id=channel.id, enabled=True)
+        await crud.upsert_channel_override(session, guild_id=guild_id, channel_id=channel.id, enabled=True)
+    interaction.client.config_cache.invalidate_channel(guild_id, channel.id)
     await interaction.response.send_message("Channel enabled for Scribe translations.", ephemeral=True)
 
 
 @channel_group.command(name="disable", description="Disable Scribe in this channel")
 @app_commands.check(guild_admin_check)
 async def channel_disable(interaction: discord.Interaction[ScribeBot]) -> None:
+    guild_id = interaction.guild_id
+    assert guild_id is not None
     channel = interaction.channel
     if not isinstance(channel, discord.TextChannel):
         await interaction.response.send_message("Only text channels are supported.", ephemeral=True)
         return
     async with interaction.client.sessionmaker() as session:
-        await crud.upsert_channel_override(session, guild_id=interaction.guild_id, channel_id=channel.id, enabled=False)
+        await crud.upsert_channel_override(session, guild_id=guild_id, channel_id=channel.id, enabled=False)
+    interaction.client.config_cache.invalidate_channel(guild_id, channel.id)
     await interaction.response.send_message("Channel disabled for Scribe translations.", ephemeral=True)
 
 
@@ -74,12 +103,15 @@ async def channel_disable(interaction: discord.Interaction[ScribeBot]) -> None:
 @app_commands.describe(mode="on_demand, threaded, dm_mirror, inline_auto")
 @app_commands.check(guild_admin_check)
 async def channel_mode(interaction: discord.Interaction[ScribeBot], mode: str) -> None:
+    guild_id = interaction.guild_id
+    assert guild_id is not None
     channel = interaction.channel
     if not isinstance(channel, discord.TextChannel):
         await interaction.response.send_message("Only text channels are supported.", ephemeral=True)
         return
     async with interaction.client.sessionmaker() as session:
-        await crud.upsert_channel_override(session, guild_id=interaction.guild_id, channel_id=channel.id, mode=mode)
+        await crud.upsert_channel_override(session, guild_id=guild_id, channel_id=channel.id, mode=mode)
+    interaction.client.config_cache.invalidate_channel(guild_id, channel.id)
     await interaction.response.send_message(f"Channel mode set to `{mode}`.", ephemeral=True)
 
 
@@ -96,6 +128,8 @@ async def channel_target_langs(
     action: app_commands.Choice[str],
     lang: Optional[str] = None,
 ) -> None:
+    guild_id = interaction.guild_id
+    assert guild_id is not None
     channel = interaction.channel
     if not isinstance(channel, discord.TextChannel):
         await interaction.response.send_message("Only text channels are supported.", ephemeral=True)
@@ -115,17 +149,19 @@ async def channel_target_langs(
         if not validate_language_code(lang):
             await interaction.response.send_message("Unsupported language code", ephemeral=True)
             return
+        lang_set = set(langs)
         if action.value == "add":
-            if lang not in langs:
-                langs.append(lang)
+            lang_set.add(lang)
         elif action.value == "remove":
-            langs = [l for l in langs if l != lang]
+            lang_set.discard(lang)
+        langs = sorted(lang_set)
         await crud.upsert_channel_override(
             session,
-            guild_id=interaction.guild_id,
+            guild_id=guild_id,
             channel_id=channel.id,
             target_langs=langs,
         )
+    interaction.client.config_cache.invalidate_channel(guild_id, channel.id)
     await interaction.response.send_message(
         "Configured target languages: " + (", ".join(langs) if langs else "(none)"),
         ephemeral=True,
@@ -136,9 +172,12 @@ async def channel_target_langs(
 @app_commands.describe(provider="google, deepl, openai")
 @app_commands.check(guild_admin_check)
 async def provider_set(interaction: discord.Interaction[ScribeBot], provider: str) -> None:
+    guild_id = interaction.guild_id
+    assert guild_id is not None
     provider = provider.lower()
     async with interaction.client.sessionmaker() as session:
-        await crud.update_guild_settings(session, interaction.guild_id, provider=provider)
+        await crud.update_guild_settings(session, guild_id, provider=provider)
+    interaction.client.config_cache.invalidate_guild(guild_id)
     await interaction.response.send_message(f"Preferred provider set to `{provider}`.", ephemeral=True)
 
 
@@ -152,18 +191,21 @@ async def glossary_add(
     context: Optional[str] = None,
     priority: Optional[int] = 100,
 ) -> None:
+    guild_id = interaction.guild_id
+    assert guild_id is not None
     async with interaction.client.sessionmaker() as session:
         entry = await crud.upsert_glossary_entry(
             session,
-            interaction.guild_id,
+            guild_id,
             term.strip(),
             translation.strip(),
             context=context,
             priority=priority or 100,
         )
-        entries = await crud.list_glossary_entries(session, interaction.guild_id)
+        entries = await crud.list_glossary_entries(session, guild_id)
+    interaction.client.glossary_cache.invalidate(guild_id)
     await interaction.response.send_message(
-        f"Saved glossary entry `{entry.term}`.\n{_render_glossary(list(entries))}",
+        f"Saved glossary entry `{entry.term}`.\n{_render_glossary(entries)}",
         ephemeral=True,
     )
 
@@ -172,8 +214,11 @@ async def glossary_add(
 @app_commands.describe(term="Glossary term")
 @app_commands.check(guild_admin_check)
 async def glossary_remove(interaction: discord.Interaction[ScribeBot], term: str) -> None:
+    guild_id = interaction.guild_id
+    assert guild_id is not None
     async with interaction.client.sessionmaker() as session:
-        removed = await crud.remove_glossary_entry(session, interaction.guild_id, term)
+        removed = await crud.remove_glossary_entry(session, guild_id, term)
+    interaction.client.glossary_cache.invalidate(guild_id)
     if removed:
         await interaction.response.send_message(f"Removed `{term}` from the glossary.", ephemeral=True)
     else:
@@ -183,25 +228,27 @@ async def glossary_remove(interaction: discord.Interaction[ScribeBot], term: str
 @admin_group.command(name="glossary-list", description="List glossary entries")
 @app_commands.check(guild_admin_check)
 async def glossary_list(interaction: discord.Interaction[ScribeBot]) -> None:
+    guild_id = interaction.guild_id
+    assert guild_id is not None
     async with interaction.client.sessionmaker() as session:
-        entries = await crud.list_glossary_entries(session, interaction.guild_id)
-    await interaction.response.send_message(_render_glossary(list(entries)), ephemeral=True)
+        entries = await crud.list_glossary_entries(session, guild_id)
+    await interaction.response.send_message(_render_glossary(entries), ephemeral=True)
 
 
 @admin_group.command(name="stats", description="Show guild usage stats")
 @app_commands.check(guild_admin_check)
 async def stats(interaction: discord.Interaction[ScribeBot]) -> None:
+    guild_id = interaction.guild_id
+    assert guild_id is not None
     async with interaction.client.sessionmaker() as session:
-        usage = await crud.get_usage_for_period(session, interaction.guild_id, days=7)
+        usage = await crud.get_usage_for_period(session, guild_id, days=7)
     if not usage:
         await interaction.response.send_message("No usage recorded yet.", ephemeral=True)
         return
-    lines = ["Last 7 days usage:"]
-    for record in usage:
-        lines.append(
-            f"• {record.day}: {record.char_count} chars, ${record.cost_estimate_usd:.4f}"
-        )
-    await interaction.response.send_message("\n".join(lines), ephemeral=True)
+    body = "".join(
+        [_USAGE_LINE(record.day, record.char_count, record.cost_estimate_usd) for record in usage]
+    )
+    await interaction.response.send_message(f"Last 7 days usage:{body}", ephemeral=True)
 
 
 @admin_group.command(name="health", description="Bot status overview")
@@ -209,10 +256,18 @@ async def stats(interaction: discord.Interaction[ScribeBot]) -> None:
 async def health(interaction: discord.Interaction[ScribeBot]) -> None:
     uptime = discord.utils.utcnow() - interaction.client.start_time
     await interaction.response.send_message(
-        f"✅ Scribe online. Uptime: {uptime}. Translators configured: {len(interaction.client.translators._ordered)}",
+        f"✅ Scribe online. Uptime: {uptime}. Translators configured: {interaction.client.translators.configured_count}",
         ephemeral=True,
     )
 
 
+@admin_group.command(name="sync", description="Force a slash command sync")
+@app_commands.check(bot_owner_check)
+async def sync(interaction: discord.Interaction[ScribeBot]) -> None:
+    await interaction.response.defer(ephemeral=True)
+    await interaction.client.sync_commands(force=True)
+    await interaction.followup.send("Slash commands synced.", ephemeral=True)
+
+
 async def setup(bot: ScribeBot) -> None:
     scribe_group.add_command(admin_group)
@@ -1,31 +1,37 @@
 ﻿from __future__ import annotations
 
-from typing import Optional
+import asyncio
+from typing import Optional, Union
 
 import discord
 from loguru import logger
 
 from bot import ScribeBot
 from bot.db import crud
-from bot.db.models import TargetKindEnum
+from bot.db.models import MessageMap, TargetKindEnum
 from bot.services.langid import detect_language
+from bot.services.spans import NON_PROSE_PATTERN
 from config import ScribeSettings
-from worker import TranslationJob, get_worker
+from worker import TranslationJob, TranslationWorker, get_worker
+
+DELETE_CONCURRENCY = 8
+ResolvedChannel = Union[discord.abc.GuildChannel, discord.abc.PrivateChannel, discord.Thread]
 
 
 async def _resolve_mode(
     bot: ScribeBot,
-    message: discord.Message,
+    guild_id: int,
+    channel_id: int,
 ) -> tuple[str, list[str]]:
-    async with bot.sessionmaker() as session:
-        override = await crud.get_channel_override(session, message.channel.id)
-        guild_settings = await crud.get_or_create_guild(session, message.guild.id)
-    mode = override.mode if override and override.mode else guild_settings.default_mode
-    langs = []
-    if override and override.target_langs:
-        langs = override.target_langs.split(",")
-    if not langs and guild_settings.default_lang:
-        langs = [guild_settings.default_lang]
+    cached = bot.config_cache.get(guild_id, channel_id)
+    if cached is None:
+        async with bot.sessionmaker() as session:
+            cached = await crud.fetch_channel_mode(session, guild_id, channel_id)
+        bot.config_cache.set(guild_id, channel_id, cached)
+    mode = cached.channel_mode or cached.guild_mode or bot.settings.default_mode
+    langs = sorted(cached.target_langs or ())
+    if not langs and cached.default_lang:
+        langs = [cached.default_lang]
     if not langs:
         langs = [bot.settings.default_guild_lang]
     if mode == "inline_auto":
@@ -34,76 +40,137 @@ async def _resolve_mode(
     return mode, langs
 
 
-async def handle_message(bot: ScribeBot, message: discord.Message) -> None:
+def _is_trivial(content: str, min_chars: int) -> bool:
+    """Return True for messages with nothing worth translating (links, emoji, mentions only)."""
+    stripped = content.strip()
+    if len(stripped) < min_chars:
+        return True
+    remainder = NON_PROSE_PATTERN.sub("", stripped)
+    return not any(char.isalpha() for char in remainder)
+
+
+def _normalize(content: str) -> str:
+    return " ".join(content.split())
+
+
+async def handle_message(bot: ScribeBot, worker: TranslationWorker, message: discord.Message) -> None:
     if message.author.bot or message.guild is None:
         return
-    if not message.content:
+    if not message.content or _is_trivial(message.content, bot.settings.min_translate_chars):
         return
-    mode, langs = await _resolve_mode(bot, message)
+    guild_id = message.guild.id
+    channel_id = message.channel.id
+    mode, langs = await _resolve_mode(bot, guild_id, channel_id)
     detection = detect_language(message.content)
-    worker = get_worker(bot)
-    for lang in langs:
-        if lang == detection.language:
-            continue
-        target_kind = TargetKindEnum.threaded
-        if mode == "inline_auto":
-            target_kind = TargetKindEnum.inline
-        elif mode == "dm_mirror":
-            target_kind = TargetKindEnum.dm
-        job = TranslationJob(
+    target_kind = TargetKindEnum.threaded
+    if mode == "inline_auto":
+        target_kind = TargetKindEnum.inline
+    elif mode == "dm_mirror":
+        target_kind = TargetKindEnum.dm
+    author = message.author
+    avatar_url = author.display_avatar.url if author.display_avatar else None
+    author_name = author.display_name
+    author_id = author.id
+    jump_url = message.jump_url
+    content = message.content
+    source_lang = detection.language
+    jobs = [
+        TranslationJob(
             message_id=message.id,
-            guild_id=message.guild.id,
-            channel_id=message.channel.id,
-            author_id=message.author.id,
-            author_name=message.author.display_name,
-            author_avatar=message.author.display_avatar.url if message.author.display_avatar else None,
-            content=message.content,
-            source_lang=detection.language,
+            guild_id=guild_id,
+            channel_id=channel_id,
+            author_id=author_id,
+            author_name=author_name,
+            author_avatar=avatar_url,
+            content=content,
+            source_lang=source_lang,
             target_lang=lang,
             target_kind=target_kind,
-            reference_url=message.jump_url,
+            reference_url=jump_url,
         )
-        await worker.enqueue(job)
+        for lang in langs
+        if lang != source_lang
+    ]
+    if jobs:
+        await worker.enqueue_many(jobs)
 
 
-async def handle_edit(bot: ScribeBot, before: discord.Message, after: discord.Message) -> None:
-    await handle_message(bot, after)
+async def handle_edit(
+    bot: ScribeBot,
+    worker: TranslationWorker,
+    before: discord.Message,
+    after: discord.Message,
+) -> None:
+    if after.edited_at is None:
+        return
+    if _normalize(before.content) == _normalize(after.content):
+        return
+    await handle_message(bot, worker, after)
+
+
+async def _resolve_channel(bot: ScribeBot, channel_id: int) -> Optional[ResolvedChannel]:
+    channel = bot.get_channel(channel_id)
+    if channel is not None:
+        return channel
+    try:
+        return await bot.fetch_channel(channel_id)
+    except discord.HTTPException:
+        logger.warning("Unable to fetch channel {} for deletion", channel_id)
+        return None
+
+
+async def _delete_translation(
+    channel: Optional[ResolvedChannel],
+    mapping: MessageMap,
+    semaphore: asyncio.Semaphore,
+) -> None:
+    if not isinstance(channel, (discord.TextChannel, discord.Thread)):
+        return
+    async with semaphore:
+        try:
+            await channel.get_partial_message(mapping.translated_msg_id).delete()
+        except discord.HTTPException:
+            logger.debug("Translated message already deleted")
 
 
 async def handle_delete(bot: ScribeBot, message: discord.Message) -> None:
     if message.guild is None:
         return
     async with bot.sessionmaker() as session:
-        mappings = await crud.fetch_message_mappings(session, original_msg_id=message.id)
-        for mapping in mappings:
-            channel = bot.get_channel(mapping.channel_id)
-            if channel is None:
-                try:
-                    channel = await bot.fetch_channel(mapping.channel_id)
-                except discord.HTTPException:
-                    logger.warning("Unable to fetch channel %s for deletion", mapping.channel_id)
-                    continue
-            if isinstance(channel, (discord.TextChannel, discord.Thread)):
-                try:
-                    msg = await channel.fetch_message(mapping.translated_msg_id)
-                    await msg.delete()
-                except discord.HTTPException:
-                    logger.debug("Translated message already deleted")
+        mappings = await crud.pop_message_mappings(session, original_msg_id=message.id)
+    if not mappings:
+        return
+    channel_ids = list({mapping.channel_id for mapping in mappings})
+    channels = await asyncio.gather(*(_resolve_channel(bot, channel_id) for channel_id in channel_ids))
+    channel_cache = dict(zip(channel_ids, channels))
+    semaphore = asyncio.Semaphore(DELETE_CONCURRENCY)
+    async with asyncio.TaskGroup() as group:
         for mapping in mappings:
-            await crud.delete_message_mapping(session, mapping.id)
+            group.create_task(_delete_translation(channel_cache[mapping.channel_id], mapping, semaphore))
 
 
 async def setup(bot: ScribeBot) -> None:
+    worker = get_worker(bot)
+
     async def on_message(message: discord.Message) -> None:
-        await handle_message(bot, message)
+        await handle_message(bot, worker, message)
 
     async def on_message_edit(before: discord.Message, after: discord.Message) -> None:
-        await handle_edit(bot, before, after)
+        await handle_edit(bot, worker, before, after)
 
     async def on_message_delete(message: discord.Message) -> None:
         await handle_delete(bot, message)
 
+    async def on_webhooks_update(channel: discord.abc.GuildChannel) -> None:
+        worker.invalidate_webhook(channel.id)
+
+    async def on_guild_channel_delete(channel: discord.abc.GuildChannel) -> None:
+        worker.forget_channel(channel.id)
+        bot.config_cache.invalidate_channel(channel.guild.id, channel.id)
+
     bot.add_listener(on_message, "on_message")
     bot.add_listener(on_message_edit, "on_message_edit")
     bot.add_listener(on_message_delete, "on_message_delete")
+    bot.add_listener(on_webhooks_update, "on_webhooks_update")
+    bot.add_listener(on_guild_channel_delete, "on_guild_channel_delete")
 
@@ -1,6 +1,6 @@
 ﻿from __future__ import annotations
 
-import re
+import asyncio
 from typing import Optional
 
 import discord
@@ -8,17 +8,15 @@ from discord import app_commands
 
 from bot import ScribeBot
 from bot.db import crud
-from bot.db.models import GlossaryEntry
+from bot.db.models import UserSettings
 from bot.exceptions import ConfigError
 from bot.services.formatting import stitch_translation
-from bot.services.glossary import apply_glossary, compile_glossary
+from bot.services.glossary import apply_glossary
 from bot.services.langid import detect_language, validate_language_code
 from bot.services.spans import extract_spans, reinsert_spans
 from bot.services.translator.base import TranslationPayload
 
-MESSAGE_LINK_RE = re.compile(
-    r"https://discord.com/channels/(?P<guild>\d+)/(?P<channel>\d+)/(?P<message>\d+)"
-)
+MESSAGE_LINK_PREFIX = "https://discord.com/channels/"
 
 
 class TranslateToggleView(discord.ui.View):
@@ -64,16 +62,26 @@ async def set_language(interaction: discord.Interaction[ScribeBot], lang: str) -
     await interaction.response.send_message(f"Saved your preferred language as `{lang}`.", ephemeral=True)
 
 
+def _parse_message_link(message_link: str) -> Optional[tuple[int, int, int]]:
+    """Return (guild_id, channel_id, message_id) for a Discord message URL, or None."""
+    link = message_link.strip().partition("?")[0].partition("#")[0].rstrip("/")
+    if not link.startswith(MESSAGE_LINK_PREFIX):
+        return None
+    parts = link[len(MESSAGE_LINK_PREFIX):].split("/")
+    if len(parts) != 3 or not all(part.isascii() and part.isdigit() for part in parts):
+        return None
+    guild_id, channel_id, message_id = map(int, parts)
+    return guild_id, channel_id, message_id
+
+
 async def _resolve_message(
     interaction: discord.Interaction[ScribeBot], message_link: str
 ) -> Optional[discord.Message]:
-    match = MESSAGE_LINK_RE.match(message_link)
-    if not match:
+    ids = _parse_message_link(message_link)
+    if ids is None:
         await interaction.response.send_message("Message link must be a Discord message URL.", ephemeral=True)
         return None
-    guild_id = int(match.group("guild"))
-    channel_id = int(match.group("channel"))
-    message_id = int(match.group("message"))
+    guild_id, channel_id, message_id = ids
     if interaction.guild_id != guild_id:
         await interaction.response.send_message("Message must belong to this guild.", ephemeral=True)
         return None
@@ -90,6 +98,11 @@ async def _resolve_message(
         return None
 
 
+async def _load_user_settings(client: ScribeBot, user_id: int) -> UserSettings:
+    async with client.sessionmaker() as session:
+        return await crud.get_or_create_user(session, user_id)
+
+
 @scribe_group.command(name="translate", description="Translate a message")
 @app_commands.describe(message="Message link to translate", to="Target language (defaults to your preference)")
 async def translate_command(
@@ -99,9 +112,10 @@ async def translate_command(
 ) -> None:
     await interaction.response.defer(ephemeral=True)
     target_lang = to.lower() if to else None
-    async with interaction.client.sessionmaker() as session:
-        user_settings = await crud.get_or_create_user(session, interaction.user.id)
-        glossary_entries = await crud.list_glossary_entries(session, interaction.guild_id or 0)
+    user_settings, glossary = await asyncio.gather(
+        _load_user_settings(interaction.client, interaction.user.id),
+        interaction.client.glossary_cache.load(interaction.client.sessionmaker, interaction.guild_id or 0),
+    )
     if not target_lang:
         target_lang = user_settings.preferred_lang or interaction.client.settings.default_guild_lang
     if not validate_language_code(target_lang):
@@ -120,13 +134,12 @@ async def translate_command(
         text=spans_text,
         source_lang=detection.language,
         target_lang=target_lang,
-        glossary=[(entry.term, entry.translation) for entry in glossary_entries] or None,
+        glossary=glossary.pairs,
     )
     outcome = await interaction.client.translators.translate(payload)
     translated = outcome.text
-    if glossary_entries:
-        compiled = compile_glossary(glossary_entries)
-        translated = apply_glossary(translated, compiled)
+    if glossary.entries:
+        translated = apply_glossary(translated, glossary.compiled)
     translated = reinsert_spans(translated, spans, target_message.content)
     link = target_message.jump_url
     final_content = stitch_translation(link, translated)
@@ -1,25 +1,39 @@
 ﻿from __future__ import annotations
 
-from datetime import date, datetime
-from typing import Iterable, Sequence
+from datetime import date
+from typing import Any, Sequence, TypeVar
 
-from sqlalchemy import delete, select
+from sqlalchemy import JSON, Integer, Row, bindparam, delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.selectable import TypedReturnsRows
 
 from .models import (
+    Base,
+    BotMeta,
     ChannelOverride,
+    ChannelOverrideLang,
     GuildSettings,
     GlossaryEntry,
     MessageMap,
-    TargetKindEnum,
     UsageStats,
     UserSettings,
 )
 
+_UPSERT_OPTIONS = {"populate_existing": True}
+
+_ModelT = TypeVar("_ModelT", bound=Base)
+
+
+async def _upsert(session: AsyncSession, stmt: TypedReturnsRows[tuple[_ModelT]]) -> _ModelT:
+    result = await session.scalars(stmt, execution_options=_UPSERT_OPTIONS)
+    row = result.one()
+    await session.commit()
+    return row
+
 
 async def get_or_create_user(session: AsyncSession, user_id: int) -> UserSettings:
-    result = await session.execute(select(UserSettings).where(UserSettings.user_id == user_id))
-    user = result.scalar_one_or_none()
+    user = await session.get(UserSettings, user_id)
     if user is None:
         user = UserSettings(user_id=user_id)
         session.add(user)
@@ -27,20 +41,25 @@ async def get_or_create_user(session: AsyncSession, user_id: int) -> UserSetting
     return user
 
 
+async def _upsert_user(session: AsyncSession, user_id: int, **values) -> UserSettings:
+    stmt = (
+        sqlite_insert(UserSettings)
+        .values(user_id=user_id, **values)
+        .on_conflict_do_update(
+            index_elements=[UserSettings.user_id],
+            set_={**values, "updated_at": func.now()},
+        )
+        .returning(UserSettings)
+    )
+    return await _upsert(session, stmt)
+
+
 async def set_user_language(session: AsyncSession, user_id: int, lang: str | None) -> UserSettings:
-    user = await get_or_create_user(session, user_id)
-    user.preferred_lang = lang
-    user.updated_at = datetime.utcnow()
-    await session.commit()
-    return user
+    return await _upsert_user(session, user_id, preferred_lang=lang)
 
 
 async def set_user_dm_mirror(session: AsyncSession, user_id: int, enabled: bool) -> UserSettings:
-    user = await get_or_create_user(session, user_id)
-    user.dm_mirror_enabled = enabled
-    user.updated_at = datetime.utcnow()
-    await session.commit()
-    return user
+    return await _upsert_user(session, user_id, dm_mirror_enabled=enabled)
 
 
 async def forget_user(session: AsyncSession, user_id: int) -> None:
@@ -48,33 +67,51 @@ async def forget_user(session: AsyncSession, user_id: int) -> None:
     await session.commit()
 
 
-async def get_or_create_guild(session: AsyncSession, guild_id: int) -> GuildSettings:
-    result = await session.execute(select(GuildSettings).where(GuildSettings.guild_id == guild_id))
-    guild = result.scalar_one_or_none()
-    if guild is None:
-        guild = GuildSettings(guild_id=guild_id)
-        session.add(guild)
-        await session.flush()
-    return guild
-
-
 async def update_guild_settings(
     session: AsyncSession,
     guild_id: int,
     **kwargs,
 ) -> GuildSettings:
-    guild = await get_or_create_guild(session, guild_id)
-    for key, value in kwargs.items():
-        if hasattr(guild, key) and value is not None:
-            setattr(guild, key, value)
-    guild.updated_at = datetime.utcnow()
-    await session.commit()
-    return guild
+    values = {
+        key: value
+        for key, value in kwargs.items()
+        if hasattr(GuildSettings, key) and value is not None
+    }
+    stmt = (
+        sqlite_insert(GuildSettings)
+        .values(guild_id=guild_id, **values)
+        .on_conflict_do_update(
+            index_elements=[GuildSettings.guild_id],
+            set_={**values, "updated_at": func.now()},
+        )
+        .returning(GuildSettings)
+    )
+    return await _upsert(session, stmt)
+
+
+_CHANNEL_KEYS = select(
+    bindparam("guild_id", type_=Integer).label("guild_id"),
+    bindparam("channel_id", type_=Integer).label("channel_id"),
+).subquery()
+_CHANNEL_MODE_STMT = (
+    select(
+        ChannelOverride.mode.label("channel_mode"),
+        select(func.json_group_array(ChannelOverrideLang.lang, type_=JSON))
+        .where(ChannelOverrideLang.channel_id == _CHANNEL_KEYS.c.channel_id)
+        .scalar_subquery()
+        .label("target_langs"),
+        GuildSettings.default_mode.label("guild_mode"),
+        GuildSettings.default_lang,
+    )
+    .select_from(_CHANNEL_KEYS)
+    .outerjoin(GuildSettings, GuildSettings.guild_id == _CHANNEL_KEYS.c.guild_id)
+    .outerjoin(ChannelOverride, ChannelOverride.channel_id == _CHANNEL_KEYS.c.channel_id)
+)
 
 
-async def get_channel_override(session: AsyncSession, channel_id: int) -> ChannelOverride | None:
-    result = await session.execute(select(ChannelOverride).where(ChannelOverride.channel_id == channel_id))
-    return result.scalar_one_or_none()
+async def fetch_channel_mode(session: AsyncSession, guild_id: int, channel_id: int) -> Row:
+    result = await session.execute(_CHANNEL_MODE_STMT, {"guild_id": guild_id, "channel_id": channel_id})
+    return result.one()
 
 
 async def upsert_channel_override(
@@ -86,65 +123,76 @@ async def upsert_channel_override(
     mode: str | None = None,
     target_langs: list[str] | None = None,
 ) -> ChannelOverride:
-    override = await get_channel_override(session, channel_id)
-    if override is None:
-        override = ChannelOverride(guild_id=guild_id, channel_id=channel_id)
-        session.add(override)
+    values: dict[str, object] = {}
     if enabled is not None:
-        override.enabled = enabled
+        values["enabled"] = enabled
     if mode is not None:
-        override.mode = mode
+        values["mode"] = mode
+    stmt = (
+        sqlite_insert(ChannelOverride)
+        .values(guild_id=guild_id, channel_id=channel_id, **values)
+        .on_conflict_do_update(
+            index_elements=[ChannelOverride.channel_id],
+            set_={**values, "updated_at": func.now()},
+        )
+    )
+    await session.execute(stmt)
     if target_langs is not None:
-        override.target_langs = ",".join(sorted(set(target_langs))) if target_langs else None
-    override.updated_at = datetime.utcnow()
+        await _replace_channel_langs(session, channel_id, set(target_langs))
+    override = await session.get(ChannelOverride, channel_id, populate_existing=True)
     await session.commit()
-    return override
+    return override  # type: ignore[return-value]
+
+
+async def _replace_channel_langs(session: AsyncSession, channel_id: int, langs: set[str]) -> None:
+    existing = set(await get_channel_target_langs(session, channel_id))
+    removed = existing - langs
+    added = langs - existing
+    if removed:
+        await session.execute(
+            delete(ChannelOverrideLang).where(
+                ChannelOverrideLang.channel_id == channel_id,
+                ChannelOverrideLang.lang.in_(removed),
+            )
+        )
+    if added:
+        await session.execute(
+            sqlite_insert(ChannelOverrideLang),
+            [{"channel_id": channel_id, "lang": lang} for lang in sorted(added)],
+        )
+
+
+_CHANNEL_LANGS_STMT = (
+    select(ChannelOverrideLang.lang)
+    .where(ChannelOverrideLang.channel_id == bindparam("channel_id"))
+    .order_by(ChannelOverrideLang.lang)
+)
 
 
 async def get_channel_target_langs(session: AsyncSession, channel_id: int) -> list[str]:
-    override = await get_channel_override(session, channel_id)
-    if override and override.target_langs:
-        return [lang for lang in override.target_langs.split(",") if lang]
-    return []
+    return list(await session.scalars(_CHANNEL_LANGS_STMT, {"channel_id": channel_id}))
 
 
-async def register_message_map(
-    session: AsyncSession,
-    *,
-    guild_id: int,
-    channel_id: int,
-    original_msg_id: int,
-    translated_msg_id: int,
-    dst_lang: str,
-    target_kind: TargetKindEnum,
-) -> MessageMap:
-    mapping = MessageMap(
-        guild_id=guild_id,
-        channel_id=channel_id,
-        original_msg_id=original_msg_id,
-        translated_msg_id=translated_msg_id,
-        dst_lang=dst_lang,
-        target_kind=target_kind,
-    )
-    session.add(mapping)
+async def register_message_maps(session: AsyncSession, rows: Sequence[dict[str, Any]]) -> None:
+    if not rows:
+        return
+    await session.execute(insert(MessageMap), list(rows))
     await session.commit()
-    return mapping
 
 
-async def fetch_message_mappings(
+_POP_MESSAGE_MAPPINGS_STMT = (
+    delete(MessageMap).where(MessageMap.original_msg_id == bindparam("original_msg_id")).returning(MessageMap)
+)
+
+
+async def pop_message_mappings(
     session: AsyncSession,
     *,
     original_msg_id: int,
 ) -> Sequence[MessageMap]:
-    result = await session.execute(
-        select(MessageMap).where(MessageMap.original_msg_id == original_msg_id)
-    )
-    return result.scalars().all()
-
-
-async def delete_message_mapping(session: AsyncSession, mapping_id: int) -> None:
-    await session.execute(delete(MessageMap).where(MessageMap.id == mapping_id))
+    mappings = (await session.scalars(_POP_MESSAGE_MAPPINGS_STMT, {"original_msg_id": original_msg_id})).all()
     await session.commit()
+    return mappings
 
 
 async def upsert_glossary_entry(
@@ -156,22 +204,17 @@ async def upsert_glossary_entry(
     context: str | None = None,
     priority: int = 100,
 ) -> GlossaryEntry:
-    entry = await session.get(GlossaryEntry, {"guild_id": guild_id, "term": term})
-    if entry is None:
-        entry = GlossaryEntry(
-            guild_id=guild_id,
-            term=term,
-            translation=translation,
-            context=context,
-            priority=priority,
+    values = {"translation": translation, "context": context, "priority": priority}
+    stmt = (
+        sqlite_insert(GlossaryEntry)
+        .values(guild_id=guild_id, term=term, **values)
+        .on_conflict_do_update(
+            index_elements=[GlossaryEntry.guild_id, GlossaryEntry.term],
+            set_=values,
         )
-        session.add(entry)
-    else:
-        entry.translation = translation
-        entry.context = context
-        entry.priority = priority
-    await session.commit()
-    return entry
+        .returning(GlossaryEntry)
+    )
+    return await _upsert(session, stmt)
 
 
 async def remove_glossary_entry(session: AsyncSession, guild_id: int, term: str) -> bool:
@@ -185,11 +228,15 @@ async def remove_glossary_entry(session: AsyncSession, guild_id: int, term: str)
     return result.rowcount > 0  # type: ignore[return-value]
 
 
+_GLOSSARY_ENTRIES_STMT = (
+    select(GlossaryEntry)
+    .where(GlossaryEntry.guild_id == bindparam("guild_id"))
+    .order_by(GlossaryEntry.priority)
+)
+
+
 async def list_glossary_entries(session: AsyncSession, guild_id: int) -> Sequence[GlossaryEntry]:
-    result = await session.execute(
-        select(GlossaryEntry).where(GlossaryEntry.guild_id == guild_id).order_by(GlossaryEntry.priority)
-    )
-    return result.scalars().all()
+    return (await session.scalars(_GLOSSARY_ENTRIES_STMT, {"guild_id": guild_id})).all()
 
 
 async def increment_usage(
@@ -199,18 +246,26 @@ async def increment_usage(
     characters: int,
     cost: float,
 ) -> UsageStats:
-    today = date.today()
-    result = await session.execute(
-        select(UsageStats).where(UsageStats.guild_id == guild_id, UsageStats.day == today)
+    stmt = (
+        sqlite_insert(UsageStats)
+        .values(guild_id=guild_id, day=date.today(), char_count=characters, cost_estimate_usd=cost)
+        .on_conflict_do_update(
+            index_elements=[UsageStats.guild_id, UsageStats.day],
+            set_={
+                "char_count": UsageStats.char_count + characters,
+                "cost_estimate_usd": UsageStats.cost_estimate_usd + cost,
+            },
+        )
+        .returning(UsageStats)
     )
-    stats = result.scalar_one_or_none()
-    if stats is None:
-        stats = UsageStats(guild_id=guild_id, day=today, char_count=0, cost_estimate_usd=0)
-        session.add(stats)
-    stats.char_count += characters
-    stats.cost_estimate_usd += cost
-    await session.commit()
-    return stats
+    return await _upsert(session, stmt)
+
+
+_USAGE_STMT = (
+    select(UsageStats)
+    .where(UsageStats.guild_id == bindparam("guild_id"), UsageStats.day >= bindparam("earliest"))
+    .order_by(UsageStats.day)
+)
 
 
 async def get_usage_for_period(
@@ -219,9 +274,19 @@ async def get_usage_for_period(
     days: int = 7,
 ) -> Sequence[UsageStats]:
     earliest = date.today().fromordinal(date.today().toordinal() - days + 1)
-    result = await session.execute(
-        select(UsageStats)
-        .where(UsageStats.guild_id == guild_id, UsageStats.day >= earliest)
-        .order_by(UsageStats.day)
+    return (await session.scalars(_USAGE_STMT, {"guild_id": guild_id, "earliest": earliest})).all()
+
+
+async def get_bot_meta(session: AsyncSession, key: str) -> str | None:
+    meta = await session.get(BotMeta, key)
+    return meta.value if meta else None
+
+
+async def set_bot_meta(session: AsyncSession, key: str, value: str) -> None:
+    stmt = (
+        sqlite_insert(BotMeta)
+        .values(key=key, value=value)
+        .on_conflict_do_update(index_elements=[BotMeta.key], set_={"value": value})
     )
-    return result.scalars().all()
+    await session.execute(stmt)
+    await session.commit()
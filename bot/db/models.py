@@ -3,8 +3,20 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Boolean, Date, DateTime, Enum as SAEnum, Float, Integer, MetaData, String, Text
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Enum as SAEnum,
+    Float,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Text,
+    func,
+)
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 metadata_obj = MetaData()
 
@@ -25,8 +37,8 @@ class UserSettings(Base):
     user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
     preferred_lang: Mapped[str | None] = mapped_column(String(8), nullable=True)
     dm_mirror_enabled: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
 
 
 class GuildSettings(Base):
@@ -39,8 +51,8 @@ class GuildSettings(Base):
     provider: Mapped[str | None] = mapped_column(String(16), nullable=True)
     cost_cap_usd: Mapped[float | None] = mapped_column(Integer, nullable=True)
     retention_hours: Mapped[int] = mapped_column(Integer, default=72)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
 
 
 class ChannelOverride(Base):
@@ -50,9 +62,24 @@ class ChannelOverride(Base):
     guild_id: Mapped[int] = mapped_column(Integer, nullable=False)
     enabled: Mapped[bool] = mapped_column(Boolean, default=False)
     mode: Mapped[str | None] = mapped_column(String(32), nullable=True)
-    target_langs: Mapped[str | None] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+    langs: Mapped[list["ChannelOverrideLang"]] = relationship(
+        lazy="selectin",
+        cascade="all, delete-orphan",
+        order_by="ChannelOverrideLang.lang",
+    )
+
+
+class ChannelOverrideLang(Base):
+    __tablename__ = "channel_override_langs"
+
+    channel_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("channel_overrides.channel_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    lang: Mapped[str] = mapped_column(String(8), primary_key=True)
 
 
 class MessageMap(Base):
@@ -61,12 +88,12 @@ class MessageMap(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     guild_id: Mapped[int] = mapped_column(Integer, nullable=False)
     channel_id: Mapped[int] = mapped_column(Integer, nullable=False)
-    original_msg_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    original_msg_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
     translated_msg_id: Mapped[int] = mapped_column(Integer, nullable=False)
     dst_lang: Mapped[str] = mapped_column(String(8), nullable=False)
     target_kind: Mapped[TargetKindEnum] = mapped_column(SAEnum(TargetKindEnum), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
 
 
 class GlossaryEntry(Base):
@@ -87,3 +114,9 @@ class UsageStats(Base):
     char_count: Mapped[int] = mapped_column(Integer, default=0)
     cost_estimate_usd: Mapped[float] = mapped_column(Float, default=0.0)
 
+
+class BotMeta(Base):
+    __tablename__ = "bot_meta"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[str] = mapped_column(Text)
@@ -3,33 +3,102 @@
 import os
 from pathlib import Path
 
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Legacy channel_overrides.target_langs column: first normalise old comma-separated rows to
+# JSON, then copy every language into channel_override_langs and drop the column.
+_MIGRATE_CSV_TARGET_LANGS = """
+UPDATE channel_overrides
+SET target_langs = CASE
+    WHEN target_langs = '' THEN NULL
+    ELSE '["' || replace(target_langs, ',', '","') || '"]'
+END
+WHERE target_langs IS NOT NULL AND NOT json_valid(target_langs)
+"""
+_COPY_TARGET_LANGS = """
+INSERT OR IGNORE INTO channel_override_langs (channel_id, lang)
+SELECT channel_overrides.channel_id, trim(langs.value)
+FROM channel_overrides, json_each(channel_overrides.target_langs) AS langs
+WHERE channel_overrides.target_langs IS NOT NULL AND trim(langs.value) != ''
+"""
+
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA foreign_keys=ON",
+)
 
 _engine: AsyncEngine | None = None
 _sessionmaker: async_sessionmaker | None = None
 
 
-def create_sessionmaker(database_path: str) -> async_sessionmaker:
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in _SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def create_sessionmaker(database_path: str, *, echo: bool = False) -> async_sessionmaker:
     global _engine, _sessionmaker
     if _sessionmaker is not None:
         return _sessionmaker
-    Path(database_path).parent.mkdir(parents=True, exist_ok=True)
-    url = f"sqlite+aiosqlite:///{database_path}"
-    _engine = create_async_engine(url, future=True, echo=False)
+    path = Path(database_path).resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    url = f"sqlite+aiosqlite:///{path}"
+    # echo="debug" logs "[cached since ...]" vs "[generated in ...]" per statement, which
+    # is the quickest way to spot a query that never hits the compiled cache.
+    # aiosqlite gets a queue pool; size it for bursty message traffic rather than the default 5.
+    _engine = create_async_engine(
+        url,
+        future=True,
+        echo="debug" if echo else False,
+        query_cache_size=1200,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        connect_args={"timeout": 30},
+    )
+    event.listen(_engine.sync_engine, "connect", _apply_sqlite_pragmas)
     _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
     return _sessionmaker
 
 
+def _create_missing_indexes(sync_conn, metadata) -> None:
+    # create_all skips tables that already exist, including any indexes added to them later.
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
+def _migrate_legacy_target_langs(sync_conn) -> None:
+    columns = {column["name"] for column in inspect(sync_conn).get_columns("channel_overrides")}
+    if "target_langs" not in columns:
+        return
+    sync_conn.exec_driver_sql(_MIGRATE_CSV_TARGET_LANGS)
+    sync_conn.exec_driver_sql(_COPY_TARGET_LANGS)
+    sync_conn.exec_driver_sql("ALTER TABLE channel_overrides DROP COLUMN target_langs")
+
+
 async def init_db(session_maker: async_sessionmaker) -> None:
     from . import models  # noqa: F401
 
     async with session_maker() as session:
         async with session.bind.begin() as conn:
             await conn.run_sync(models.Base.metadata.create_all)
+            await conn.run_sync(_create_missing_indexes, models.Base.metadata)
+            await conn.run_sync(_migrate_legacy_target_langs)
 
 
 async def get_session():
     if _sessionmaker is None:
         raise RuntimeError("Sessionmaker has not been initialized.")
-    async with _sessionmaker() as session:  # type: ignore[misc]
+    async with _sessionmaker() as session:
         yield session
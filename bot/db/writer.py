@@ -0,0 +1,97 @@
+﻿from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import Any, Optional
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from . import crud
+
+MAX_BATCH = 64
+FLUSH_INTERVAL = 0.02
+MAX_BACKOFF = 30.0
+MAX_RETAINED = 1024
+
+
+class MessageMapWriter:
+    """Buffers message map rows and inserts them in batches, one transaction per batch."""
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        *,
+        max_batch: int = MAX_BATCH,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_retained: int = MAX_RETAINED,
+    ) -> None:
+        self._sessionmaker = session_maker
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_retained = max_retained
+        self.queue: "asyncio.Queue[dict[str, Any]]" = asyncio.Queue()
+        self._failed: list[dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop(), name="scribe-message-map-writer")
+
+    def enqueue(self, row: dict[str, Any]) -> None:
+        self.queue.put_nowait(row)
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        await self.queue.join()
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        if self._failed:
+            try:
+                await self._write(self._failed)
+            except Exception:
+                logger.exception("Dropping {} unwritten message map rows", len(self._failed))
+            self._failed.clear()
+
+    async def _flush_loop(self) -> None:
+        backoff = 0.0
+        while True:
+            # Rows from failed batches go first and stay buffered until a write succeeds.
+            retried = self._failed[: self.max_batch]
+            rows = await self._collect(self.max_batch - len(retried), wait=not retried)
+            try:
+                await self._write([*retried, *rows])
+                del self._failed[: len(retried)]
+                backoff = 0.0
+            except Exception:
+                logger.exception("Failed writing {} message map rows", len(retried) + len(rows))
+                self._retain(rows)
+                backoff = min(max(backoff * 2, 1.0), MAX_BACKOFF)
+            finally:
+                for _ in rows:
+                    self.queue.task_done()
+            if backoff:
+                await asyncio.sleep(backoff)
+
+    async def _collect(self, limit: int, *, wait: bool) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = []
+        if wait:
+            rows.append(await self.queue.get())
+            await asyncio.sleep(self.flush_interval)
+        while len(rows) < limit and not self.queue.empty():
+            rows.append(self.queue.get_nowait())
+        return rows
+
+    def _retain(self, rows: list[dict[str, Any]]) -> None:
+        self._failed.extend(rows)
+        overflow = len(self._failed) - self.max_retained
+        if overflow > 0:
+            del self._failed[:overflow]
+            logger.warning("Message map retry buffer full; dropped {} rows", overflow)
+
+    async def _write(self, rows: list[dict[str, Any]]) -> None:
+        async with self._sessionmaker() as session:
+            await crud.register_message_maps(session, rows)
@@ -0,0 +1,85 @@
+﻿from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Iterator, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Process-local LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl: float = 300.0,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(list(self._data))
+
+    def get(self, key: K) -> Optional[V]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= self._clock():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._data[key] = (self._clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        item = self._data.pop(key, None)
+        if item is None:
+            return default
+        return item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class ChannelConfigCache(Generic[V]):
+    """Caches resolved channel/guild settings keyed by ``(guild_id, channel_id)``."""
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl: float = 300.0,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._entries: TTLCache[tuple[int, int], V] = TTLCache(
+            maxsize=maxsize, ttl=ttl, clock=clock
+        )
+
+    def get(self, guild_id: int, channel_id: int) -> Optional[V]:
+        return self._entries.get((guild_id, channel_id))
+
+    def set(self, guild_id: int, channel_id: int, value: V) -> None:
+        self._entries.set((guild_id, channel_id), value)
+
+    def invalidate_channel(self, guild_id: int, channel_id: int) -> None:
+        self._entries.pop((guild_id, channel_id))
+
+    def invalidate_guild(self, guild_id: int) -> None:
+        for key in self._entries:
+            if key[0] == guild_id:
+                self._entries.pop(key)
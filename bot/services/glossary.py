@@ -1,30 +1,141 @@
 ﻿from __future__ import annotations
 
 import re
+import sys
 from dataclasses import dataclass
-from typing import Iterable
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Sequence, cast
 
+from bot.db import crud
 from bot.db.models import GlossaryEntry
+from bot.services.config_cache import TTLCache
+
+try:
+    import ahocorasick  # type: ignore[import-not-found]
+except ImportError:  # optional: pip install scribe[glossary]
+    ahocorasick = None
 
 
 @dataclass(slots=True)
 class CompiledGlossary:
-    pattern: re.Pattern[str]
-    replacement: str
-    term: str
+    pattern: Optional[re.Pattern[str]]
+    replacements: dict[str, str]
+    automaton: Any = None
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _build_automaton(terms: Sequence[tuple[str, str]]) -> Any:
+    if ahocorasick is None or not terms:
+        return None
+    if not all(term and term.isascii() for term, _ in terms):
+        return None
+    automaton = ahocorasick.Automaton()
+    for rank, (term, translation) in enumerate(terms):
+        key = term.lower()
+        if not automaton.exists(key):
+            automaton.add_word(key, (rank, len(key), translation))
+    automaton.make_automaton()
+    return automaton
+
+
+def _apply_automaton(text: str, automaton: Any) -> Optional[str]:
+    """Mirror the regex semantics: leftmost match wins, ties go to the higher-priority term."""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        return None
+    length = len(text)
+    best: dict[int, tuple[int, int, str]] = {}
+    for end, (rank, size, replacement) in automaton.iter(lowered):
+        start = end - size + 1
+        stop = end + 1
+        word_before = start > 0 and _is_word(text[start - 1])
+        word_after = stop < length and _is_word(text[stop])
+        if word_before == _is_word(text[start]) or word_after == _is_word(text[end]):
+            continue
+        current = best.get(start)
+        if current is None or rank < current[0]:
+            best[start] = (rank, stop, replacement)
+    if not best:
+        return text
+    pieces: list[str] = []
+    cursor = 0
+    for start in sorted(best):
+        if start < cursor:
+            continue
+        _, stop, replacement = best[start]
+        pieces.append(text[cursor:start])
+        pieces.append(replacement)
+        cursor = stop
+    pieces.append(text[cursor:])
+    return "".join(pieces)
+
+
+def compile_glossary(entries: Iterable[GlossaryEntry]) -> CompiledGlossary:
+    fingerprint = tuple(sorted((entry.priority, entry.term, entry.translation) for entry in entries))
+    return _compile_fingerprint(fingerprint)
+
+
+@lru_cache(maxsize=256)
+def _compile_fingerprint(fingerprint: tuple[tuple[int, str, str], ...]) -> CompiledGlossary:
+    terms = [(term, translation) for _, term, translation in fingerprint]
+    alternatives: list[str] = []
+    replacements: dict[str, str] = {}
+    for index, (term, translation) in enumerate(terms):
+        group = f"g{index}"
+        alternatives.append(rf"(?P<{group}>\b{re.escape(term)}\b)")
+        replacements[group] = translation
+    if not alternatives:
+        return CompiledGlossary(pattern=None, replacements=replacements)
+    # Alternatives are tried left to right, so priority order decides overlapping terms.
+    pattern = re.compile("|".join(alternatives), re.IGNORECASE)
+    return CompiledGlossary(pattern=pattern, replacements=replacements, automaton=_build_automaton(terms))
+
+
+def apply_glossary(text: str, compiled: CompiledGlossary) -> str:
+    if compiled.pattern is None:
+        return text
+    if compiled.automaton is not None:
+        result = _apply_automaton(text, compiled.automaton)
+        if result is not None:
+            return result
+    replacements = compiled.replacements
+    return compiled.pattern.sub(lambda match: replacements[cast(str, match.lastgroup)], text)
+
+
+@dataclass(slots=True)
+class CachedGlossary:
+    entries: tuple[GlossaryEntry, ...]
+    compiled: CompiledGlossary
+    pairs: list[tuple[str, str]] | None = None
+
+
+class GlossaryCache:
+    """Per-guild glossary entries and compiled patterns, invalidated on glossary edits."""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300.0) -> None:
+        self._guilds: TTLCache[int, CachedGlossary] = TTLCache(maxsize=maxsize, ttl=ttl)
 
+    def get(self, guild_id: int) -> Optional[CachedGlossary]:
+        return self._guilds.get(guild_id)
 
-def compile_glossary(entries: Iterable[GlossaryEntry]) -> list[CompiledGlossary]:
-    compiled: list[CompiledGlossary] = []
-    for entry in sorted(entries, key=lambda e: e.priority):
-        escaped = re.escape(entry.term)
-        pattern = re.compile(rf"\b{escaped}\b", re.IGNORECASE)
-        compiled.append(CompiledGlossary(pattern=pattern, replacement=entry.translation, term=entry.term))
-    return compiled
+    async def load(self, session_maker: Any, guild_id: int) -> CachedGlossary:
+        cached = self._guilds.get(guild_id)
+        if cached is not None:
+            return cached
+        async with session_maker() as session:
+            entries = await crud.list_glossary_entries(session, guild_id)
+        return self.store(guild_id, entries)
 
+    def store(self, guild_id: int, entries: Iterable[GlossaryEntry]) -> CachedGlossary:
+        entries = tuple(entries)
+        # Shared read-only by every payload for this guild until the entry is invalidated.
+        pairs = [(sys.intern(entry.term), entry.translation) for entry in entries] or None
+        cached = CachedGlossary(entries=entries, compiled=compile_glossary(entries), pairs=pairs)
+        self._guilds.set(guild_id, cached)
+        return cached
 
-def apply_glossary(text: str, compiled: Iterable[CompiledGlossary]) -> str:
-    result = text
-    for item in compiled:
-        result = item.pattern.sub(item.replacement, result)
-    return result
+    def invalidate(self, guild_id: int) -> None:
+        self._guilds.pop(guild_id)
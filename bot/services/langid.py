@@ -2,6 +2,7 @@
 
 from dataclasses import dataclass
 from functools import lru_cache
+from typing import Optional
 
 from langdetect import DetectorFactory, LangDetectException, detect_langs
 
@@ -33,29 +34,82 @@ class DetectionResult:
     confidence: float
 
 
-@lru_cache(maxsize=512)
-def detect_language(text: str) -> DetectionResult:
-    cleaned = text.strip()
+# Only scripts that identify a single language; Cyrillic, Arabic and Devanagari are shared
+# by several languages (uk/ru, fa/ur/ar, mr/hi), so those go through langdetect.
+_OTHER, _KANA, _HAN, _HANGUL = range(4)
+_SCRIPT_RANGES = (
+    (0x1100, 0x11FF, _HANGUL),
+    (0x3040, 0x30FF, _KANA),
+    (0x3130, 0x318F, _HANGUL),
+    (0x31F0, 0x31FF, _KANA),
+    (0x3400, 0x4DBF, _HAN),
+    (0x4E00, 0x9FFF, _HAN),
+    (0xAC00, 0xD7AF, _HANGUL),
+    (0xFF66, 0xFF9F, _KANA),
+)
+# Script id for every BMP code point; anything not listed above is _OTHER.
+_SCRIPT_TABLE = bytearray(0x10000)
+for _first, _last, _script in _SCRIPT_RANGES:
+    _SCRIPT_TABLE[_first : _last + 1] = bytes((_script,)) * (_last - _first + 1)
+_SCRIPT_LANG = {
+    _HAN: "zh",
+    _HANGUL: "ko",
+}
+SCRIPT_SAMPLE = 64
+
+
+def _script_language(text: str) -> Optional[str]:
+    """Return the language implied by a dominant (>= 80%) CJK script, if any."""
+    counts = [0] * 4
+    letters = 0
+    for char in text[:SCRIPT_SAMPLE]:
+        if not char.isalpha():
+            continue
+        letters += 1
+        code = ord(char)
+        if code < 0x10000:
+            counts[_SCRIPT_TABLE[code]] += 1
+    if not letters:
+        return None
+    threshold = letters * 0.8
+    # Japanese mixes kana with kanji; any kana makes Han-heavy text Japanese.
+    if counts[_KANA] and counts[_KANA] + counts[_HAN] >= threshold:
+        return "ja"
+    for script, lang in _SCRIPT_LANG.items():
+        if counts[script] >= threshold:
+            return lang
+    return None
+
+
 # Quick heuristics for high-frequency tokens where langdetect struggles.
-    heuristics = {
-        "bonjour": ("fr", 0.95),
-        "hola": ("es", 0.95),
-        "hello": ("en", 0.95),
-    }
-    if cleaned.lower() in heuristics:
-        lang, conf = heuristics[cleaned.lower()]
+HEURISTICS = {
+    "bonjour": ("fr", 0.95),
+    "hola": ("es", 0.95),
+    "hello": ("en", 0.95),
+}
+
+
+def detect_language(text: str) -> DetectionResult:
+    return _detect_cached(text.strip().lower()[:400])
+
+
+@lru_cache(maxsize=2048)
+def _detect_cached(cleaned: str) -> DetectionResult:
+    if cleaned in HEURISTICS:
+        lang, conf = HEURISTICS[cleaned]
         return DetectionResult(language=lang, confidence=conf)
     if not cleaned:
         return DetectionResult(language="", confidence=0.0)
+    if not cleaned.isascii():
+        script_lang = _script_language(cleaned)
+        if script_lang:
+            return DetectionResult(language=script_lang, confidence=0.95)
     try:
-        candidates = detect_langs(cleaned[:400])
+        candidates = detect_langs(cleaned)
     except LangDetectException:
         return DetectionResult(language="", confidence=0.0)
     best = max(candidates, key=lambda c: c.prob)
-    lang = best.lang.lower()
-    if lang not in SUPPORTED_LANGS:
-        return DetectionResult(language=lang, confidence=best.prob)
-    return DetectionResult(language=lang, confidence=best.prob)
+    return DetectionResult(language=best.lang.lower(), confidence=best.prob)
 
 
 def mostly_matches_language(text: str, target: str, threshold: float = 0.8) -> bool:
@@ -71,5 +125,3 @@ def mostly_matches_language(text: str, target: str, threshold: float = 0.8) -> b
 
 def validate_language_code(code: str) -> bool:
     return code.lower() in SUPPORTED_LANGS
-
-
@@ -1,12 +1,12 @@
 ﻿from __future__ import annotations
 
-import statistics
-from collections import defaultdict, deque
+import bisect
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Deque, Dict
+from typing import Deque, Dict, List
 
 
-@dataclass
+@dataclass(slots=True)
 class Counter:
     name: str
     value: int = 0
@@ -15,33 +15,41 @@ class Counter:
         self.value += amount
 
 
-@dataclass
+@dataclass(slots=True)
 class Histogram:
     name: str
     values: Deque[float] = field(default_factory=lambda: deque(maxlen=500))
+    sorted_values: List[float] = field(default_factory=list)
 
     def observe(self, value: float) -> None:
+        if len(self.values) == self.values.maxlen:
+            oldest = self.values[0]
+            del self.sorted_values[bisect.bisect_left(self.sorted_values, oldest)]
         self.values.append(value)
+        bisect.insort(self.sorted_values, value)
 
     def percentile(self, pct: float) -> float:
-        if not self.values:
+        data = self.sorted_values
+        if not data:
             return 0.0
-        data = sorted(self.values)
         index = int(len(data) * pct)
         index = min(index, len(data) - 1)
         return data[index]
 
 
 class MetricsRegistry:
+    __slots__ = ("counters", "histograms")
+
     def __init__(self) -> None:
-        self.counters: Dict[str, Counter] = defaultdict(lambda: Counter(name="unknown"))
+        self.counters: Dict[str, Counter] = {}
         self.histograms: Dict[str, Histogram] = {}
 
     def counter(self, name: str) -> Counter:
         counter = self.counters.get(name)
-        if counter is None:
-            counter = Counter(name=name)
-            self.counters[name] = counter
+        if counter is not None:
+            return counter
+        counter = Counter(name=name)
+        self.counters[name] = counter
         return counter
 
     def histogram(self, name: str) -> Histogram:
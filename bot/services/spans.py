@@ -3,7 +3,7 @@
 import re
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Iterable, List, Tuple
+from typing import Iterable, List, cast
 
 from bot.exceptions import SpanParsingError
 
@@ -39,53 +39,76 @@ MARKDOWN_LINK_PATTERN = re.compile(r"\[[^\]]+\]\([^\)\s]+\)")
 URL_PATTERN = re.compile(r"https?://[^\s]+", re.IGNORECASE)
 
 PLACEHOLDER_TEMPLATE = "⟦SP{index}⟧"
+PLACEHOLDER_PATTERN = re.compile(r"⟦SP\d+⟧")
+
+# Ordered by precedence: when two patterns match at the same offset the earlier one wins.
+SPAN_PATTERNS: tuple[tuple[str, re.Pattern[str], SpanType], ...] = (
+    ("code_block", CODE_BLOCK_PATTERN, SpanType.CODE_BLOCK),
+    ("spoiler", SPOILER_PATTERN, SpanType.SPOILER),
+    ("block_quote", BLOCK_QUOTE_PATTERN, SpanType.BLOCK_QUOTE),
+    ("inline_code", INLINE_CODE_PATTERN, SpanType.INLINE_CODE),
+    ("markdown_link", MARKDOWN_LINK_PATTERN, SpanType.LINK),
+    ("url", URL_PATTERN, SpanType.LINK),
+    ("mention", MENTION_PATTERN, SpanType.MENTION),
+    ("custom_emoji", CUSTOM_EMOJI_PATTERN, SpanType.CUSTOM_EMOJI),
+    ("timestamp", TIMESTAMP_PATTERN, SpanType.TIMESTAMP),
+)
+
+
+def _scoped(pattern: re.Pattern[str]) -> str:
+    flags = "".join(
+        letter
+        for flag, letter in ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"))
+        if pattern.flags & flag
+    )
+    return f"(?{flags}:{pattern.pattern})" if flags else pattern.pattern
+
+
+COMBINED_SPAN_PATTERN = re.compile(
+    "|".join(f"(?P<{name}>{_scoped(pattern)})" for name, pattern, _ in SPAN_PATTERNS)
+)
+SPAN_TYPE_BY_GROUP = {name: span_type for name, _, span_type in SPAN_PATTERNS}
+# Tokens that carry no prose of their own: links, custom emoji, mentions and timestamps.
+NON_PROSE_PATTERN = re.compile(
+    "|".join(
+        _scoped(pattern)
+        for pattern in (URL_PATTERN, CUSTOM_EMOJI_PATTERN, MENTION_PATTERN, TIMESTAMP_PATTERN)
+    )
+)
+SPAN_MARKERS = ("`", "||", ">", "<", "://", "](")
 
 
 def extract_spans(raw: str) -> tuple[str, list[Span]]:
+    if not any(marker in raw for marker in SPAN_MARKERS):
+        return raw, []
     spans: List[Span] = []
-    taken: List[Tuple[int, int]] = []
 
-    def register(match: re.Match[str], span_type: SpanType) -> None:
-        start, end = match.span()
-        if start == end:
-            return
-        for existing_start, existing_end in taken:
-            if start < existing_end and end > existing_start:
-                return
+    # sub() walks the combined pattern once and splices the placeholders in C.
+    def stash(match: re.Match[str]) -> str:
         placeholder = PLACEHOLDER_TEMPLATE.format(index=len(spans))
-        spans.append(Span(span_type, start, end, placeholder, raw[start:end]))
-        taken.append((start, end))
-
-    for pattern, span_type in (
-        (CODE_BLOCK_PATTERN, SpanType.CODE_BLOCK),
-        (SPOILER_PATTERN, SpanType.SPOILER),
-        (BLOCK_QUOTE_PATTERN, SpanType.BLOCK_QUOTE),
-        (INLINE_CODE_PATTERN, SpanType.INLINE_CODE),
-        (MARKDOWN_LINK_PATTERN, SpanType.LINK),
-        (URL_PATTERN, SpanType.LINK),
-        (MENTION_PATTERN, SpanType.MENTION),
-        (CUSTOM_EMOJI_PATTERN, SpanType.CUSTOM_EMOJI),
-        (TIMESTAMP_PATTERN, SpanType.TIMESTAMP),
-    ):
-        for match in pattern.finditer(raw):
-            register(match, span_type)
-
-    spans.sort(key=lambda span: span.start)
-    builder: list[str] = []
-    cursor = 0
-    for span in spans:
-        builder.append(raw[cursor:span.start])
-        builder.append(span.placeholder)
-        cursor = span.end
-    builder.append(raw[cursor:])
-    transformed = "".join(builder)
-    return transformed, spans
+        start, end = match.span()
+        spans.append(Span(SPAN_TYPE_BY_GROUP[cast(str, match.lastgroup)], start, end, placeholder, match.group()))
+        return placeholder
+
+    return COMBINED_SPAN_PATTERN.sub(stash, raw), spans
 
 
 def reinsert_spans(translated_text: str, spans: Iterable[Span], original_raw: str) -> str:
-    result = translated_text
-    for span in spans:
-        if span.placeholder not in result:
-            raise SpanParsingError(f"Missing placeholder {span.placeholder}")
-        result = result.replace(span.placeholder, span.original)
-    return result
+    originals = {span.placeholder: span.original for span in spans}
+    if not originals:
+        return translated_text
+    found: set[str] = set()
+
+    def restore(match: re.Match[str]) -> str:
+        placeholder = match.group()
+        original = originals.get(placeholder)
+        if original is None:
+            return placeholder
+        found.add(placeholder)
+        return original
+
+    restored = PLACEHOLDER_PATTERN.sub(restore, translated_text)
+    if len(found) != len(originals):
+        missing = next(placeholder for placeholder in originals if placeholder not in found)
+        raise SpanParsingError(f"Missing placeholder {missing}")
+    return restored
@@ -5,6 +5,7 @@ import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 
+import httpx
 from loguru import logger
 
 from config import ProviderName, ScribeSettings
@@ -20,6 +21,27 @@ class TranslationPayload:
     timeout: float = 15.0
 
 
+@dataclass(slots=True)
+class BatchPayload:
+    """Several texts sharing one language pair and glossary, kept as parallel fields."""
+
+    texts: list[str]
+    source_lang: str
+    target_lang: str
+    glossary: list[tuple[str, str]] | None = None
+    timeout: float = 15.0
+
+    @classmethod
+    def single(cls, payload: TranslationPayload) -> "BatchPayload":
+        return cls(
+            [payload.text],
+            payload.source_lang,
+            payload.target_lang,
+            payload.glossary,
+            payload.timeout,
+        )
+
+
 @dataclass(slots=True)
 class TranslationOutcome:
     text: str
@@ -39,6 +61,30 @@ class Translator(ABC):
     async def translate(self, payload: TranslationPayload) -> TranslationOutcome:
         raise NotImplementedError
 
+    async def translate_batch(self, batch: BatchPayload) -> list[TranslationOutcome]:
+        """Providers with a list API override this to send the whole batch in one request."""
+        return list(
+            await asyncio.gather(
+                *(
+                    self.translate(
+                        TranslationPayload(
+                            text,
+                            batch.source_lang,
+                            batch.target_lang,
+                            batch.glossary,
+                            batch.timeout,
+                        )
+                    )
+                    for text in batch.texts
+                )
+            )
+        )
+
+    async def aclose(self) -> None:
+        client: httpx.AsyncClient | None = getattr(self, "_client", None)
+        if client is not None:
+            await client.aclose()
+
 
 class TranslatorRegistry:
     """Manages configured translators and provides fallback behaviour."""
@@ -47,7 +93,6 @@ class TranslatorRegistry:
         self._settings = settings
         self._translators: dict[ProviderName, Translator] = {}
         self._ordered: list[ProviderName] = []
-        self._lock = asyncio.Lock()
         self._instantiate(settings)
 
     def _instantiate(self, settings: ScribeSettings) -> None:
@@ -74,6 +119,13 @@ class TranslatorRegistry:
         if not self._ordered:
             logger.warning("No translators configured; falling back to echo translator")
 
+    @property
+    def configured_count(self) -> int:
+        return len(self._ordered)
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(translator.aclose() for translator in self._translators.values()))
+
     async def translate(self, payload: TranslationPayload) -> TranslationOutcome:
         if not self._ordered:
             return TranslationOutcome(
@@ -82,21 +134,20 @@ class TranslatorRegistry:
                 latency=0.0,
                 char_count=len(payload.text),
             )
-        async with self._lock:
-            for provider_name in self._ordered:
-                translator = self._translators[provider_name]
-                try:
-                    start = time.perf_counter()
-                    outcome = await translator.translate(payload)
-                    outcome.latency = time.perf_counter() - start
-                    outcome.char_count = len(payload.text)
-                    return outcome
-                except ProviderError as exc:
-                    logger.warning("Provider {} failed: {}", provider_name, exc)
-                    continue
-                except TranslationError as exc:
-                    logger.warning("Transient failure from {}: {}", provider_name, exc)
-                    continue
+        for provider_name in self._ordered:
+            translator = self._translators[provider_name]
+            try:
+                start = time.perf_counter()
+                outcome = await translator.translate(payload)
+                outcome.latency = time.perf_counter() - start
+                outcome.char_count = len(payload.text)
+                return outcome
+            except ProviderError as exc:
+                logger.warning("Provider {} failed: {}", provider_name, exc)
+                continue
+            except TranslationError as exc:
+                logger.warning("Transient failure from {}: {}", provider_name, exc)
+                continue
         logger.error("All translators failed; returning original text")
         return TranslationOutcome(
             text=payload.text,
@@ -104,3 +155,36 @@ class TranslatorRegistry:
             latency=0.0,
             char_count=len(payload.text),
         )
+
+    async def translate_batch(self, batch: BatchPayload) -> list[TranslationOutcome]:
+        texts = batch.texts
+        if not self._ordered:
+            return [
+                TranslationOutcome(text=text, provider="echo", latency=0.0, char_count=len(text))  # type: ignore[arg-type]
+                for text in texts
+            ]
+        for provider_name in self._ordered:
+            translator = self._translators[provider_name]
+            try:
+                start = time.perf_counter()
+                outcomes = await translator.translate_batch(batch)
+                if len(outcomes) != len(texts):
+                    raise ProviderError(f"expected {len(texts)} translations, got {len(outcomes)}")
+                latency = time.perf_counter() - start
+                for text, outcome in zip(texts, outcomes):
+                    outcome.latency = latency
+                    outcome.char_count = len(text)
+                return outcomes
+            except ProviderError as exc:
+                logger.warning("Provider {} failed: {}", provider_name, exc)
+                continue
+            except TranslationError as exc:
+                logger.warning("Transient failure from {}: {}", provider_name, exc)
+                continue
+        logger.error("All translators failed; returning original text")
+        return [
+            TranslationOutcome(
+                text=text, provider=self._ordered[-1], latency=0.0, char_count=len(text)
+            )
+            for text in texts
+        ]
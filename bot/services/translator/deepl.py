@@ -5,7 +5,7 @@ import httpx
 from config import ScribeSettings
 from bot.exceptions import ProviderError
 
-from .base import TranslationOutcome, TranslationPayload, Translator
+from .base import BatchPayload, TranslationOutcome, TranslationPayload, Translator
 
 
 class DeepLTranslator(Translator):
@@ -17,15 +17,18 @@ class DeepLTranslator(Translator):
         self._api_key = settings.provider.deepl_api_key
         if not self._api_key:
             raise ProviderError("DEEPL_API_KEY not configured")
-        self._client = httpx.AsyncClient(timeout=20.0)
+        self._client: httpx.AsyncClient = httpx.AsyncClient(timeout=20.0)
 
     async def translate(self, payload: TranslationPayload) -> TranslationOutcome:
-        params = {
-            "text": payload.text,
-            "target_lang": payload.target_lang.upper(),
+        return (await self.translate_batch(BatchPayload.single(payload)))[0]
+
+    async def translate_batch(self, batch: BatchPayload) -> list[TranslationOutcome]:
+        params: dict[str, str | list[str]] = {
+            "text": batch.texts,
+            "target_lang": batch.target_lang.upper(),
         }
-        if payload.source_lang:
-            params["source_lang"] = payload.source_lang.upper()
+        if batch.source_lang:
+            params["source_lang"] = batch.source_lang.upper()
         response = await self._client.post(
             "https://api-free.deepl.com/v2/translate",
             data=params,
@@ -34,5 +37,7 @@ class DeepLTranslator(Translator):
         if response.status_code >= 400:
             raise ProviderError(f"DeepL returned {response.status_code}: {response.text}")
         data = response.json()
-        translated = data["translations"][0]["text"]
-        return TranslationOutcome(text=translated, provider=self.name, latency=0.0, char_count=len(payload.text))
+        return [
+            TranslationOutcome(text=item["text"], provider=self.name, latency=0.0, char_count=len(text))
+            for text, item in zip(batch.texts, data["translations"])
+        ]
@@ -8,7 +8,7 @@ import httpx
 from config import ScribeSettings
 from bot.exceptions import ProviderError
 
-from .base import TranslationOutcome, TranslationPayload, Translator
+from .base import BatchPayload, TranslationOutcome, TranslationPayload, Translator
 
 
 class GoogleTranslator(Translator):
@@ -27,19 +27,22 @@ class GoogleTranslator(Translator):
         self._access_token = creds.get("token")
         if not self._access_token:
             raise ProviderError("Google credentials missing token field")
-        self._client = httpx.AsyncClient(timeout=20.0)
+        self._client: httpx.AsyncClient = httpx.AsyncClient(timeout=20.0)
 
     async def translate(self, payload: TranslationPayload) -> TranslationOutcome:
+        return (await self.translate_batch(BatchPayload.single(payload)))[0]
+
+    async def translate_batch(self, batch: BatchPayload) -> list[TranslationOutcome]:
         url = (
             f"https://translation.googleapis.com/v3/projects/{self._project_id}:translateText"
         )
         body = {
-            "contents": [payload.text],
+            "contents": batch.texts,
             "mimeType": "text/plain",
-            "targetLanguageCode": payload.target_lang,
+            "targetLanguageCode": batch.target_lang,
         }
-        if payload.source_lang:
-            body["sourceLanguageCode"] = payload.source_lang
+        if batch.source_lang:
+            body["sourceLanguageCode"] = batch.source_lang
         response = await self._client.post(
             url,
             headers={"Authorization": f"Bearer {self._access_token}"},
@@ -48,5 +51,7 @@ class GoogleTranslator(Translator):
         if response.status_code >= 400:
             raise ProviderError(f"Google Translate API error {response.status_code}: {response.text}")
         data = response.json()
-        translated = data["translations"][0]["translatedText"]
-        return TranslationOutcome(text=translated, provider=self.name, latency=0.0, char_count=len(payload.text))
+        return [
+            TranslationOutcome(text=item["translatedText"], provider=self.name, latency=0.0, char_count=len(text))
+            for text, item in zip(batch.texts, data["translations"])
+        ]
@@ -1,6 +1,7 @@
 ﻿from __future__ import annotations
 
 import httpx
+import orjson
 
 from config import ScribeSettings
 from bot.exceptions import ProviderError
@@ -8,6 +9,12 @@ from bot.exceptions import ProviderError
 from .base import TranslationOutcome, TranslationPayload, Translator
 
 
+SYSTEM_PROMPT = (
+    "You are a translation engine. Translate the user content preserving Markdown formatting and code."
+)
+_BODY_SUFFIX = b"}]}"
+
+
 class OpenAITranslator(Translator):
     name = "openai"
 
@@ -17,30 +24,35 @@ class OpenAITranslator(Translator):
         if not self._api_key:
             raise ProviderError("OPENAI_API_KEY not configured")
         self._model = getattr(settings, "openai_model", "gpt-4o-mini")
-        self._client = httpx.AsyncClient(timeout=20.0)
+        # Every request goes to the same host, so keep a small pool of warm HTTP/2 connections.
+        self._client: httpx.AsyncClient = httpx.AsyncClient(
+            base_url="https://api.openai.com",
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0),
+            timeout=httpx.Timeout(20.0, connect=5.0),
+            headers={
+                "Authorization": f"Bearer {self._api_key}",
+                "Content-Type": "application/json",
+            },
+        )
+        # Only the user message varies between requests, so serialize everything else once:
+        # the template ends with the system message, and each call appends the user turn.
+        template = orjson.dumps(
+            {
+                "model": self._model,
+                "temperature": 0,
+                "messages": [{"role": "system", "content": SYSTEM_PROMPT}],
+            }
+        )
+        self._body_prefix = template[:-2] + b',{"role":"user","content":'
 
     async def translate(self, payload: TranslationPayload) -> TranslationOutcome:
-        headers = {
-            "Authorization": f"Bearer {self._api_key}",
-            "Content-Type": "application/json",
-        }
-        body = {
-            "model": self._model,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are a translation engine. Translate the user content preserving Markdown formatting and code." ,
-                },
-                {
-                    "role": "user",
-                    "content": payload.text,
-                },
-            ],
-            "temperature": 0,
-        }
-        response = await self._client.post("https://api.openai.com/v1/chat/completions", headers=headers, json=body)
+        body = b"".join((self._body_prefix, orjson.dumps(payload.text), _BODY_SUFFIX))
+        response = await self._client.post("/v1/chat/completions", content=body)
         if response.status_code >= 400:
-            raise ProviderError(f"OpenAI returned {response.status_code}: {response.text}")
-        data = response.json()
-        translated = data["choices"][0]["message"]["content"].strip()
+            raise ProviderError(f"OpenAI returned {response.status_code}: {response.content[:512]!r}")
+        try:
+            translated = orjson.loads(response.content)["choices"][0]["message"]["content"].strip()
+        except (KeyError, IndexError, TypeError, orjson.JSONDecodeError) as exc:
+            raise ProviderError("OpenAI returned an unexpected response body") from exc
         return TranslationOutcome(text=translated, provider=self.name, latency=0.0, char_count=len(payload.text))
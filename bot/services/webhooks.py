@@ -1,33 +1,64 @@
 ﻿from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import Optional
 
 import discord
 from loguru import logger
 
-
-@dataclass
-class WebhookEntry:
-    webhook: discord.Webhook
-    lock: asyncio.Lock
+_NO_MENTIONS = discord.AllowedMentions.none()
+MAX_CACHED_WEBHOOKS = 1024
 
 
 class WebhookManager:
-    def __init__(self) -> None:
-        self._cache: Dict[int, WebhookEntry] = {}
+    def __init__(self, maxsize: int = MAX_CACHED_WEBHOOKS) -> None:
+        self.maxsize = maxsize
+        self._cache: OrderedDict[int, "asyncio.Future[discord.Webhook]"] = OrderedDict()
+
+    def get_cached(self, channel_id: int) -> Optional[discord.Webhook]:
+        future = self._cache.get(channel_id)
+        if (
+            future is None
+            or not future.done()
+            or future.cancelled()
+            or future.exception() is not None
+        ):
+            return None
+        self._cache.move_to_end(channel_id)
+        return future.result()
+
+    def invalidate(self, channel_id: int) -> None:
+        """Forget a resolved webhook so the next send looks it up again; in-flight lookups are kept."""
+        future = self._cache.get(channel_id)
+        if future is not None and future.done():
+            del self._cache[channel_id]
 
     async def ensure_webhook(self, channel: discord.TextChannel) -> discord.Webhook:
-        entry = self._cache.get(channel.id)
-        if entry:
-            return entry.webhook
-        lock = asyncio.Lock()
-        self._cache[channel.id] = WebhookEntry(webhook=None, lock=lock)  # type: ignore[arg-type]
-        async with lock:
+        future = self._cache.get(channel.id)
+        if future is not None:
+            return await future
+        # Concurrent callers for the same channel share this future instead of racing the API.
+        future = asyncio.get_running_loop().create_future()
+        self._cache[channel.id] = future
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        try:
             webhook = await self._create_webhook(channel)
-            self._cache[channel.id] = WebhookEntry(webhook=webhook, lock=lock)
-            return webhook
+        except asyncio.CancelledError:
+            if self._cache.get(channel.id) is future:
+                del self._cache[channel.id]
+            future.cancel()
+            raise
+        except Exception as exc:
+            # Drop the entry so the next caller retries; mark the error retrieved for waiter-less futures.
+            if self._cache.get(channel.id) is future:
+                del self._cache[channel.id]
+            future.set_exception(exc)
+            future.exception()
+            raise
+        future.set_result(webhook)
+        return webhook
 
     async def _create_webhook(self, channel: discord.TextChannel) -> discord.Webhook:
         try:
@@ -47,11 +78,31 @@ class WebhookManager:
         avatar_url: Optional[str],
         content: str,
     ) -> Optional[discord.Message]:
-        webhook = await self.ensure_webhook(channel)
+        webhook = self.get_cached(channel.id) or await self.ensure_webhook(channel)
+        try:
+            return await self._send(
+                webhook, username=username, avatar_url=avatar_url, content=content
+            )
+        except discord.NotFound:
+            # The cached webhook was deleted out from under us; look it up once more.
+            self.invalidate(channel.id)
+            webhook = await self.ensure_webhook(channel)
+            return await self._send(
+                webhook, username=username, avatar_url=avatar_url, content=content
+            )
+
+    @staticmethod
+    async def _send(
+        webhook: discord.Webhook,
+        *,
+        username: str,
+        avatar_url: Optional[str],
+        content: str,
+    ) -> discord.Message:
         return await webhook.send(
             content=content,
             username=username,
             avatar_url=avatar_url,
             wait=True,
-            allowed_mentions=discord.AllowedMentions.none(),
+            allowed_mentions=_NO_MENTIONS,
         )
@@ -1,14 +1,16 @@
 ﻿from __future__ import annotations
 
-from functools import lru_cache
-from typing import List, Literal
+import re
+from functools import cached_property, lru_cache
+from typing import Annotated, Any, List, Literal, cast
 
 from loguru import logger
-from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import BaseModel, Field, PrivateAttr, ValidationError, computed_field, field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 ProviderName = Literal["openai", "deepl", "google"]
 SUPPORTED_PROVIDERS = {"openai", "deepl", "google"}
+_LIST_TOKEN = re.compile(r"[^,\s]+")
 
 
 class ProviderConfig(BaseModel):
@@ -19,6 +21,8 @@ class ProviderConfig(BaseModel):
     google_project_id: str | None = None
     google_credentials: str | None = None
 
+    _ordered: tuple[ProviderName, ...] = PrivateAttr(default=())
+
     @field_validator("name")
     @classmethod
     def validate_provider(cls, value: str) -> ProviderName:
@@ -30,25 +34,18 @@ class ProviderConfig(BaseModel):
     @field_validator("fallbacks", mode="after")
     @classmethod
     def dedupe_fallbacks(cls, value: List[ProviderName]) -> List[ProviderName]:
-        seen: set[str] = set()
-        ordered: List[ProviderName] = []
-        for item in value:
-            item_lower = item.lower()
-            if item_lower in seen or item_lower == "":
-                continue
-            if item_lower not in SUPPORTED_PROVIDERS:
+        lowered = [item.lower() for item in value if item]
+        for item in lowered:
+            if item not in SUPPORTED_PROVIDERS:
                 logger.warning("Ignoring unsupported fallback provider '{}'.", item)
-                continue
-            ordered.append(item_lower)  # type: ignore[arg-type]
-            seen.add(item_lower)
-        return ordered
+        supported = (cast(ProviderName, item) for item in lowered if item in SUPPORTED_PROVIDERS)
+        return list(dict.fromkeys(supported))
+
+    def model_post_init(self, __context: Any) -> None:
+        self._ordered = tuple(dict.fromkeys([self.name, *self.fallbacks]))
 
-    def ordered(self) -> List[ProviderName]:
-        base: List[ProviderName] = [self.name]
-        for fallback in self.fallbacks:
-            if fallback not in base:
-                base.append(fallback)
-        return base
+    def ordered(self) -> tuple[ProviderName, ...]:
+        return self._ordered
 
 
 class ScribeSettings(BaseSettings):
@@ -62,44 +59,57 @@ class ScribeSettings(BaseSettings):
     default_guild_lang: str = Field(default="en", alias="DEFAULT_GUILD_LANG")
     default_mode: str = Field(default="on_demand", alias="DEFAULT_MODE")
     inline_auto_max_langs: int = Field(default=1, alias="INLINE_AUTO_MAX_LANGS")
+    min_translate_chars: int = Field(default=1, alias="MIN_TRANSLATE_CHARS")
     retention_hours: int = Field(default=72, alias="RETENTION_HOURS")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
 
     database_path: str = Field(default="data/scribe.db", alias="DATABASE_PATH")
+    database_echo: bool = Field(default=False, alias="DATABASE_ECHO")
 
     translator_provider: ProviderName = Field(default="openai", alias="TRANSLATOR_PROVIDER")
-    translator_fallbacks: str | None = Field(default=None, alias="TRANSLATOR_FALLBACKS")
+    translator_fallbacks: Annotated[List[ProviderName], NoDecode] = Field(
+        default_factory=list,
+        alias="TRANSLATOR_FALLBACKS",
+    )
     openai_api_key: str | None = Field(default=None, alias="OPENAI_API_KEY")
     deepl_api_key: str | None = Field(default=None, alias="DEEPL_API_KEY")
     google_project_id: str | None = Field(default=None, alias="GOOGLE_PROJECT_ID")
     google_credentials: str | None = Field(default=None, alias="GOOGLE_APPLICATION_CREDENTIALS")
 
-    provider: ProviderConfig = Field(default_factory=ProviderConfig)
+    force_command_sync: bool = Field(default=False, alias="SCRIBE_FORCE_COMMAND_SYNC")
 
     worker_mode: bool = Field(default=False, alias="SCRIBE_WORKER_MODE")
+    worker_concurrency: int = Field(default=4, ge=1, alias="SCRIBE_WORKER_CONCURRENCY")
+    worker_queue_max: int = Field(default=1024, ge=1, alias="SCRIBE_WORKER_QUEUE_MAX")
     healthcheck_host: str = Field(default="127.0.0.1", alias="HEALTHCHECK_HOST")
     healthcheck_port: int = Field(default=8080, alias="HEALTHCHECK_PORT")
 
-    @model_validator(mode="after")
-    def _build_provider(self) -> "ScribeSettings":
-        fallbacks_list: List[ProviderName] = []
-        if self.translator_fallbacks:
-            candidates = [item.strip() for item in self.translator_fallbacks.split(",") if item.strip()]
-            for item in candidates:
-                lowered = item.lower()
-                if lowered in SUPPORTED_PROVIDERS:
-                    fallbacks_list.append(lowered)  # type: ignore[arg-type]
-                else:
-                    logger.warning("Ignoring unsupported fallback provider '{}'.", item)
-        self.provider = ProviderConfig(
+    @field_validator("translator_fallbacks", mode="before")
+    @classmethod
+    def _parse_fallbacks(cls, value: Any) -> List[str]:
+        if not value:
+            return []
+        items = _LIST_TOKEN.findall(value) if isinstance(value, str) else [item.strip() for item in value]
+        fallbacks: List[str] = []
+        for item in items:
+            lowered = item.lower()
+            if lowered in SUPPORTED_PROVIDERS:
+                fallbacks.append(lowered)
+            elif lowered:
+                logger.warning("Ignoring unsupported fallback provider '{}'.", item)
+        return fallbacks
+
+    @computed_field  # type: ignore[prop-decorator]
+    @cached_property
+    def provider(self) -> ProviderConfig:
+        return ProviderConfig(
             name=self.translator_provider,
-            fallbacks=fallbacks_list,
+            fallbacks=self.translator_fallbacks,
             openai_api_key=self.openai_api_key,
             deepl_api_key=self.deepl_api_key,
             google_project_id=self.google_project_id,
             google_credentials=self.google_credentials,
         )
-        return self
 
     @property
     def TRANSLATOR_PROVIDER(self) -> ProviderName:
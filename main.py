@@ -2,6 +2,7 @@
 
 import asyncio
 import signal
+import sys
 
 import discord
 from loguru import logger
@@ -10,20 +11,37 @@ from bot import ScribeBot
 from config import get_settings
 from worker import get_worker
 
+try:
+    import uvloop  # type: ignore[import-not-found]
+except ImportError:  # not available on Windows
+    _HAS_UVLOOP = False
+else:
+    _HAS_UVLOOP = True
+
+INTENTS = discord.Intents.default()
+INTENTS.members = INTENTS.message_content = INTENTS.guilds = True
+
+
+_log_handler: tuple[int, str] | None = None
+
 
 def configure_logging(level: str) -> None:
-    logger.remove()
-    logger.add(lambda msg: print(msg, end=""), level=level.upper(), backtrace=False, diagnose=False)
+    global _log_handler
+    level = level.upper()
+    if _log_handler is not None:
+        handler_id, current_level = _log_handler
+        if current_level == level:
+            return
+        logger.remove(handler_id)
+    else:
+        logger.remove()
+    _log_handler = (logger.add(sys.stdout, level=level, backtrace=False, diagnose=False), level)
 
 
 async def runner() -> None:
     settings = get_settings()
     configure_logging(settings.log_level)
-    intents = discord.Intents.default()
-    intents.members = True
-    intents.message_content = True
-    intents.guilds = True
-    bot = ScribeBot(intents=intents, settings=settings)
+    bot = ScribeBot(intents=INTENTS, settings=settings)
     get_worker(bot)
 
     loop = asyncio.get_running_loop()
@@ -33,12 +51,12 @@ async def runner() -> None:
         logger.info("Shutdown signal received")
         stop_event.set()
 
-    for sig in (signal.SIGINT, signal.SIGTERM):
-        try:
-            loop.add_signal_handler(sig, _signal_handler)
-        except NotImplementedError:
-            # Windows may not support all signals
-            pass
+    try:
+        loop.add_signal_handler(signal.SIGINT, _signal_handler)
+        loop.add_signal_handler(signal.SIGTERM, _signal_handler)
+    except NotImplementedError:
+        # Windows event loops do not support add_signal_handler
+        pass
 
     async with bot:
         start_task = asyncio.create_task(bot.start(settings.discord_token))
@@ -48,7 +66,10 @@ async def runner() -> None:
 
 
 def main() -> None:
-    asyncio.run(runner())
+    if _HAS_UVLOOP:
+        uvloop.run(runner())
+    else:
+        asyncio.run(runner())
 
 
 if __name__ == "__main__":
@@ -9,7 +9,7 @@ from config import get_settings
 
 
 async def main() -> None:
-    settings = get_settings()
+    settings = get_settings().model_copy(update={"force_command_sync": True})
     intents = discord.Intents.none()
     bot = ScribeBot(intents=intents, settings=settings)
     async with bot:
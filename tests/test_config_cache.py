@@ -0,0 +1,60 @@
+﻿from __future__ import annotations
+
+from bot.services.config_cache import ChannelConfigCache, TTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expires_entries() -> None:
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache(maxsize=4, ttl=10.0, clock=clock)
+    cache.set("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10.0, clock=FakeClock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert list(cache) == ["a", "c"]
+
+
+def test_ttl_cache_set_refreshes_expiry() -> None:
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache(maxsize=4, ttl=10.0, clock=clock)
+    cache.set("a", 1)
+    clock.now = 8.0
+    cache.set("a", 2)
+    clock.now = 15.0
+    assert cache.get("a") == 2
+    assert cache.pop("a") == 2
+    assert cache.pop("a", 0) == 0
+
+
+def test_channel_config_cache_invalidation() -> None:
+    clock = FakeClock()
+    cache: ChannelConfigCache[str] = ChannelConfigCache(ttl=10.0, clock=clock)
+    cache.set(1, 10, "guild-1-channel-10")
+    cache.set(1, 11, "guild-1-channel-11")
+    cache.set(2, 10, "guild-2-channel-10")
+    cache.invalidate_channel(1, 10)
+    assert cache.get(1, 10) is None
+    assert cache.get(1, 11) == "guild-1-channel-11"
+    cache.invalidate_guild(1)
+    assert cache.get(1, 11) is None
+    assert cache.get(2, 10) == "guild-2-channel-10"
+    clock.now = 10.0
+    assert cache.get(2, 10) is None
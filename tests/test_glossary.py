@@ -2,7 +2,9 @@
 
 from types import SimpleNamespace
 
-from bot.services.glossary import apply_glossary, compile_glossary
+import pytest
+
+from bot.services.glossary import CompiledGlossary, apply_glossary, compile_glossary
 
 
 def make_entry(term: str, translation: str, priority: int = 100) -> SimpleNamespace:
@@ -23,3 +25,25 @@ def test_apply_glossary_priority() -> None:
     result = apply_glossary("the application", compiled)
     assert "solicitud" in result
 
+
+def test_apply_glossary_single_pass() -> None:
+    entries = [make_entry("cat", "dog", priority=10), make_entry("dog", "bird", priority=20)]
+    compiled = compile_glossary(entries)
+    assert apply_glossary("cat and dog", compiled) == "dog and bird"
+    assert apply_glossary("cat", compile_glossary([])) == "cat"
+
+
+def test_automaton_matches_regex() -> None:
+    pytest.importorskip("ahocorasick")
+    entries = [
+        make_entry("app", "aplicación", priority=10),
+        make_entry("application", "solicitud", priority=200),
+        make_entry("C++", "cpp", priority=50),
+        make_entry("API", "Interfaz", priority=100),
+    ]
+    compiled = compile_glossary(entries)
+    assert compiled.automaton is not None
+    texts = ["the application app", "apps and APIs", "use C++ or c++11", "API_key api", "Ünïcode app"]
+    regex_only = CompiledGlossary(pattern=compiled.pattern, replacements=compiled.replacements)
+    fast = [apply_glossary(text, compiled) for text in texts]
+    assert fast == [apply_glossary(text, regex_only) for text in texts]
@@ -9,6 +9,18 @@ def test_detect_language_simple() -> None:
     assert result.confidence > 0.5
 
 
+def test_detect_language_script_shortcut() -> None:
+    assert detect_language("こんにちは、元気ですか").language == "ja"
+    assert detect_language("안녕하세요 반갑습니다").language == "ko"
+    assert detect_language("你好，今天天气很好").language == "zh"
+
+
+def test_detect_language_shared_scripts_use_langdetect() -> None:
+    assert detect_language("Привіт, як справи? Все добре").language == "uk"
+    assert detect_language("سلام، حال شما چطور است؟").language == "fa"
+    assert detect_language("یہ ایک اچھا دن ہے").language == "ur"
+
+
 def test_mostly_matches_language_threshold() -> None:
     assert mostly_matches_language("bonjour", "fr")
     assert not mostly_matches_language("hello bonjour", "fr", threshold=0.9)
@@ -0,0 +1,44 @@
+﻿from __future__ import annotations
+
+import pytest
+
+from bot.cogs.listeners import _is_trivial, _normalize
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "https://example.com/page",
+        "HTTPS://EXAMPLE.COM <https://example.com>",
+        "<:wave:123456789> <a:party:987654321>",
+        "<@123> <@!456> <@&789> <#1011>",
+        "<t:1700000000:R>",
+        "k",
+        "  ?  ",
+    ],
+)
+def test_is_trivial_skips_non_prose(content: str) -> None:
+    assert _is_trivial(content, min_chars=2)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "ok",
+        "hello <@123>",
+        "see https://example.com for details",
+        "<:wave:123456789> bonjour",
+    ],
+)
+def test_is_trivial_keeps_prose(content: str) -> None:
+    assert not _is_trivial(content, min_chars=2)
+
+
+def test_is_trivial_keeps_single_cjk_character() -> None:
+    assert not _is_trivial("好", min_chars=1)
+    assert _is_trivial("<@123>", min_chars=1)
+
+
+def test_normalize_collapses_whitespace_only() -> None:
+    assert _normalize("  hello \n  world ") == _normalize("hello world")
+    assert _normalize("polish") != _normalize("Polish")
@@ -0,0 +1,15 @@
+﻿from __future__ import annotations
+
+from bot.services.metrics import Histogram
+
+
+def test_histogram_percentile_tracks_window() -> None:
+    histogram = Histogram(name="latency")
+    assert histogram.percentile(0.5) == 0.0
+    for value in range(600):
+        histogram.observe(float(value))
+    assert len(histogram.values) == 500
+    assert histogram.sorted_values == sorted(histogram.values)
+    assert histogram.percentile(0.0) == 100.0
+    assert histogram.percentile(0.5) == 350.0
+    assert histogram.percentile(1.0) == 599.0
@@ -0,0 +1,61 @@
+﻿from __future__ import annotations
+
+import asyncio
+import sqlite3
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from bot.db.session import init_db
+
+LEGACY_CHANNEL_OVERRIDES = """
+CREATE TABLE channel_overrides (
+    channel_id INTEGER PRIMARY KEY,
+    guild_id INTEGER NOT NULL,
+    enabled BOOLEAN,
+    mode VARCHAR(32),
+    target_langs TEXT,
+    created_at DATETIME,
+    updated_at DATETIME
+)
+"""
+
+
+def test_init_db_migrates_legacy_target_langs(tmp_path: Path) -> None:
+    database = tmp_path / "scribe.db"
+    with sqlite3.connect(database) as conn:
+        conn.execute(LEGACY_CHANNEL_OVERRIDES)
+        conn.executemany(
+            "INSERT INTO channel_overrides (channel_id, guild_id, enabled, mode, target_langs) "
+            "VALUES (?, 1, 1, 'inline_auto', ?)",
+            [
+                (1, "de,fr"),
+                (2, ""),
+                (3, None),
+                (4, '["es", " it "]'),
+                (5, "ja, ko"),
+            ],
+        )
+    conn.close()
+
+    async def migrate() -> None:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{database}")
+        try:
+            session_maker = async_sessionmaker(engine)
+            await init_db(session_maker)
+            await init_db(session_maker)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(migrate())
+
+    with sqlite3.connect(database) as conn:
+        langs = conn.execute(
+            "SELECT channel_id, lang FROM channel_override_langs ORDER BY channel_id, lang"
+        ).fetchall()
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(channel_overrides)")}
+        channels = [row[0] for row in conn.execute("SELECT channel_id FROM channel_overrides")]
+    conn.close()
+    assert langs == [(1, "de"), (1, "fr"), (4, "es"), (4, "it"), (5, "ja"), (5, "ko")]
+    assert "target_langs" not in columns
+    assert channels == [1, 2, 3, 4, 5]
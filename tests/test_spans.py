@@ -40,6 +40,14 @@ def test_block_quotes() -> None:
     assert rebuilt.startswith("> quoted text")
 
 
+def test_plain_prose_has_no_spans() -> None:
+    raw = "Just a normal sentence: nothing special here."
+    transformed, extracted = spans.extract_spans(raw)
+    assert transformed == raw
+    assert extracted == []
+    assert spans.reinsert_spans(transformed, extracted, raw) == raw
+
+
 def test_missing_placeholder_raises() -> None:
     raw = "`code`"
     transformed, extracted = spans.extract_spans(raw)
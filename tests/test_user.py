@@ -0,0 +1,38 @@
+﻿from __future__ import annotations
+
+import pytest
+
+from bot.cogs.user import _parse_message_link
+
+
+@pytest.mark.parametrize(
+    "link",
+    [
+        "https://discord.com/channels/1/22/333",
+        "  https://discord.com/channels/1/22/333/  ",
+        "https://discord.com/channels/1/22/333?context=reply",
+        "https://discord.com/channels/1/22/333#top",
+        "https://discord.com/channels/1/22/333/?a=1#b",
+    ],
+)
+def test_parse_message_link(link: str) -> None:
+    assert _parse_message_link(link) == (1, 22, 333)
+
+
+@pytest.mark.parametrize(
+    "link",
+    [
+        "",
+        "https://example.com/channels/1/22/333",
+        "https://canary.discord.com/channels/1/22/333",
+        "https://discord.com/channels/1/22",
+        "https://discord.com/channels/1/22/333/4444",
+        "https://discord.com/channels/@me/22/333",
+        "https://discord.com/channels/1/22/abc",
+        "https://discord.com/channels/1/22/-333",
+        "https://discord.com/channels/1/22/３３３",
+        "https://discord.com/channels/1//333",
+    ],
+)
+def test_parse_message_link_rejects_malformed(link: str) -> None:
+    assert _parse_message_link(link) is None
@@ -0,0 +1,139 @@
+﻿from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import discord
+import pytest
+from loguru import logger
+
+import worker as worker_module
+from bot.db.models import TargetKindEnum
+from bot.services.glossary import GlossaryCache
+from bot.services.translator.base import BatchPayload, TranslationOutcome
+from worker import TranslationJob, TranslationWorker
+
+
+class FakeTranslators:
+    def __init__(self, *, slow: str = "", failing_lang: str = "") -> None:
+        self.calls: list[tuple[str, str, list[str]]] = []
+        self.slow = slow
+        self.failing_lang = failing_lang
+
+    async def translate_batch(self, batch: BatchPayload) -> list[TranslationOutcome]:
+        self.calls.append((batch.source_lang, batch.target_lang, list(batch.texts)))
+        if batch.target_lang == self.failing_lang:
+            raise RuntimeError("provider down")
+        if self.slow and any(self.slow in text for text in batch.texts):
+            await asyncio.sleep(0.05)
+        return [
+            TranslationOutcome(
+                text=text.upper(), provider="openai", latency=0.0, char_count=len(text)
+            )
+            for text in batch.texts
+        ]
+
+
+class FakeChannel(discord.Thread):
+    def __init__(self, channel_id: int, sent: list[tuple[int, str]]) -> None:
+        self.id = channel_id
+        self.sent = sent
+
+    async def send(self, content: str, **_: Any) -> SimpleNamespace:  # type: ignore[override]
+        self.sent.append((self.id, content))
+        return SimpleNamespace(id=len(self.sent))
+
+
+def make_bot(
+    translators: FakeTranslators, *, concurrency: int = 1, queue_max: int = 64
+) -> SimpleNamespace:
+    sent: list[tuple[int, str]] = []
+    channels = {channel_id: FakeChannel(channel_id, sent) for channel_id in (10, 20)}
+    glossary_cache = GlossaryCache()
+    for guild_id in (1, 2):
+        glossary_cache.store(guild_id, [])
+    return SimpleNamespace(
+        settings=SimpleNamespace(worker_concurrency=concurrency, worker_queue_max=queue_max),
+        translators=translators,
+        glossary_cache=glossary_cache,
+        message_map_writer=SimpleNamespace(enqueue=lambda row: None),
+        get_channel=channels.get,
+        sent=sent,
+        worker=None,
+    )
+
+
+def make_job(
+    content: str, *, guild_id: int = 1, channel_id: int = 10, target_lang: str = "fr"
+) -> TranslationJob:
+    return TranslationJob(
+        message_id=1,
+        guild_id=guild_id,
+        channel_id=channel_id,
+        author_id=1,
+        author_name="author",
+        author_avatar=None,
+        content=content,
+        source_lang="en",
+        target_lang=target_lang,
+        target_kind=TargetKindEnum.inline,
+        reference_url=None,
+    )
+
+
+async def run_jobs(bot: SimpleNamespace, jobs: list[TranslationJob]) -> None:
+    worker = TranslationWorker(bot)  # type: ignore[arg-type]
+    await worker.enqueue_many(jobs)
+    worker.start()
+    await asyncio.wait_for(worker.queue.join(), timeout=5)
+    await worker.close()
+
+
+def test_burst_shares_one_call_per_group() -> None:
+    translators = FakeTranslators()
+    bot = make_bot(translators)
+    jobs = [
+        make_job("one"),
+        make_job("two", target_lang="de"),
+        make_job("three", guild_id=2, channel_id=20),
+        make_job("four"),
+    ]
+    asyncio.run(run_jobs(bot, jobs))
+    assert sorted(translators.calls) == [
+        ("en", "de", ["two"]),
+        ("en", "fr", ["one", "four"]),
+        ("en", "fr", ["three"]),
+    ]
+    assert bot.sent == [(10, "ONE"), (10, "TWO"), (20, "THREE"), (10, "FOUR")]
+
+
+def test_channel_batches_deliver_in_pickup_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(worker_module, "BATCH_SIZE", 1)
+    translators = FakeTranslators(slow="slow")
+    bot = make_bot(translators, concurrency=2)
+    asyncio.run(run_jobs(bot, [make_job("slow"), make_job("fast")]))
+    assert len(translators.calls) == 2
+    assert bot.sent == [(10, "SLOW"), (10, "FAST")]
+
+
+def test_enqueue_many_drops_when_full() -> None:
+    bot = make_bot(FakeTranslators(), queue_max=2)
+    messages: list[str] = []
+    handler_id = logger.add(messages.append, format="{message}")
+    try:
+        worker = TranslationWorker(bot)  # type: ignore[arg-type]
+        asyncio.run(worker.enqueue_many([make_job(str(index)) for index in range(5)]))
+    finally:
+        logger.remove(handler_id)
+    assert worker.queue.qsize() == 2
+    assert any("dropped 3 jobs" in message for message in messages)
+
+
+def test_failed_group_does_not_block_others() -> None:
+    translators = FakeTranslators(failing_lang="de")
+    bot = make_bot(translators)
+    jobs = [make_job("one"), make_job("two", target_lang="de"), make_job("three", channel_id=20)]
+    asyncio.run(run_jobs(bot, jobs))
+    assert len(translators.calls) == 2
+    assert bot.sent == [(10, "ONE"), (20, "THREE")]
@@ -0,0 +1,105 @@
+﻿from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from bot.db import writer as writer_module
+from bot.db.writer import MessageMapWriter
+
+
+class FakeSessionMaker:
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.attempts = 0
+        self.batches: list[list[int]] = []
+
+    def __call__(self) -> FakeSessionMaker:
+        return self
+
+    async def __aenter__(self) -> FakeSessionMaker:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+    async def execute(self, statement: Any, rows: list[dict[str, Any]]) -> None:
+        self.attempts += 1
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database is locked")
+        self.batches.append([row["translated_msg_id"] for row in rows])
+
+    async def commit(self) -> None:
+        return None
+
+
+def make_row(index: int) -> dict[str, Any]:
+    return {"translated_msg_id": index}
+
+
+@pytest.fixture
+def backoffs(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    recorded: list[float] = []
+    sleep = asyncio.sleep
+
+    async def fake_sleep(delay: float) -> None:
+        if delay >= 1.0:
+            recorded.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(writer_module.asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+async def write_rows(
+    session_maker: FakeSessionMaker, rows: list[dict[str, Any]], **options: Any
+) -> None:
+    writer = MessageMapWriter(session_maker, flush_interval=0.0, **options)  # type: ignore[arg-type]
+    for row in rows:
+        writer.enqueue(row)
+    writer.start()
+    await writer.close()
+
+
+def test_writer_batches_rows() -> None:
+    session_maker = FakeSessionMaker()
+    asyncio.run(write_rows(session_maker, [make_row(index) for index in range(7)], max_batch=3))
+    assert session_maker.batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_writer_retries_failed_rows_with_backoff(backoffs: list[float]) -> None:
+    session_maker = FakeSessionMaker(failures=2)
+    asyncio.run(write_rows(session_maker, [make_row(index) for index in range(5)], max_batch=3))
+    assert backoffs == [1.0, 2.0]
+    assert [row for batch in session_maker.batches for row in batch] == [0, 1, 2, 3, 4]
+
+
+def test_writer_caps_retained_rows(backoffs: list[float]) -> None:
+    session_maker = FakeSessionMaker(failures=2)
+    rows = [make_row(index) for index in range(6)]
+    asyncio.run(write_rows(session_maker, rows, max_batch=3, max_retained=2))
+    assert [row for batch in session_maker.batches for row in batch] == [2, 3, 4, 5]
+
+
+def test_writer_close_drains_queue() -> None:
+    session_maker = FakeSessionMaker()
+
+    async def scenario() -> None:
+        writer = MessageMapWriter(session_maker)  # type: ignore[arg-type]
+        writer.start()
+        for index in range(100):
+            writer.enqueue(make_row(index))
+        await writer.close()
+        assert writer.queue.empty()
+
+    asyncio.run(scenario())
+    assert [row for batch in session_maker.batches for row in batch] == list(range(100))
+
+
+def test_writer_close_gives_up_when_database_is_down(backoffs: list[float]) -> None:
+    session_maker = FakeSessionMaker(failures=1_000)
+    asyncio.run(write_rows(session_maker, [make_row(index) for index in range(3)]))
+    assert session_maker.batches == []
+    assert session_maker.attempts >= 2
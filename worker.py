@@ -1,20 +1,34 @@
 ﻿from __future__ import annotations
 
 import asyncio
+import contextlib
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Iterable, Optional
 
 import discord
 from loguru import logger
 
-from bot.db import crud
 from bot.db.models import TargetKindEnum
+from bot.exceptions import SpanParsingError
+from bot.services.config_cache import TTLCache
 from bot.services.formatting import sanitize_for_webhook, stitch_translation
-from bot.services.glossary import apply_glossary, compile_glossary
+from bot.services.glossary import apply_glossary
 from bot.services.spans import extract_spans, reinsert_spans
-from bot.services.translator.base import TranslationPayload
+from bot.services.translator.base import BatchPayload
 from bot.services.webhooks import WebhookManager
 
+if TYPE_CHECKING:
+    from bot import ScribeBot
+
+CHANNEL_CACHE_TTL = 300.0
+MISSING_CHANNEL_TTL = 60.0
+BATCH_SIZE = 16
+BATCH_WINDOW = 0.05
+MAX_RESTART_BACKOFF = 30.0
+
+# channel id -> (turn of the previous batch for that channel, this batch's turn)
+_ChannelTurns = dict[int, tuple[Optional["asyncio.Future[None]"], "asyncio.Future[None]"]]
+
 
 @dataclass(slots=True)
 class TranslationJob:
@@ -34,66 +48,219 @@ class TranslationJob:
 class TranslationWorker:
     def __init__(self, bot: "ScribeBot") -> None:
         self.bot = bot
-        self.queue: "asyncio.Queue[TranslationJob]" = asyncio.Queue()
-        self._task: Optional[asyncio.Task] = None
+        self.queue: "asyncio.Queue[TranslationJob]" = asyncio.Queue(maxsize=bot.settings.worker_queue_max)
+        self._supervisor: Optional[asyncio.Task] = None
+        self._channel_turns: dict[int, "asyncio.Future[None]"] = {}
+        self._collect_lock = asyncio.Lock()
         self._webhooks = WebhookManager()
         self._thread_cache: dict[int, int] = {}
+        self._channel_cache: TTLCache[int, Any] = TTLCache(maxsize=1024, ttl=CHANNEL_CACHE_TTL)
+        self._missing_channels: TTLCache[int, bool] = TTLCache(maxsize=1024, ttl=MISSING_CHANNEL_TTL)
 
     def start(self) -> None:
-        if self._task is None:
-            self._task = asyncio.create_task(self._run(), name="scribe-worker")
+        if self._supervisor is None or self._supervisor.done():
+            self._supervisor = asyncio.create_task(self._supervise(), name="scribe-worker-supervisor")
+
+    async def close(self) -> None:
+        if self._supervisor is None:
+            return
+        self._supervisor.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._supervisor
+        self._supervisor = None
+
+    async def _supervise(self) -> None:
+        # Cancelling the supervisor cancels every worker, and a worker crash takes its siblings down with it.
+        loop = asyncio.get_running_loop()
+        backoff = 1.0
+        while True:
+            started = loop.time()
+            try:
+                async with asyncio.TaskGroup() as group:
+                    for index in range(self.bot.settings.worker_concurrency):
+                        group.create_task(self._run(), name=f"scribe-worker-{index}")
+            except* Exception:
+                logger.exception("Translation workers stopped; restarting in {:.0f}s", backoff)
+            if loop.time() - started > MAX_RESTART_BACKOFF:
+                backoff = 1.0
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_RESTART_BACKOFF)
+
+    def invalidate_webhook(self, channel_id: int) -> None:
+        self._webhooks.invalidate(channel_id)
+
+    def forget_channel(self, channel_id: int) -> None:
+        self._channel_cache.pop(channel_id)
+        self._thread_cache.pop(channel_id, None)
+        self._webhooks.invalidate(channel_id)
 
     async def enqueue(self, job: TranslationJob) -> None:
         await self.queue.put(job)
 
+    async def enqueue_many(self, jobs: Iterable[TranslationJob]) -> None:
+        # Called from gateway event handlers, which must not stall; shed load instead of blocking.
+        dropped = 0
+        for job in jobs:
+            try:
+                self.queue.put_nowait(job)
+            except asyncio.QueueFull:
+                dropped += 1
+        if dropped:
+            logger.warning("Translation queue full; dropped {} jobs", dropped)
+
     async def _run(self) -> None:
         while True:
-            job = await self.queue.get()
+            # One worker collects at a time, so batches are claimed in queue order.
+            async with self._collect_lock:
+                jobs = await self._collect_batch()
+                turns = self._claim_channels(jobs)
             try:
-                await self._process(job)
+                await self._process_batch(jobs, turns)
             except Exception:
-                logger.exception("Failed processing translation job %s", job)
+                logger.exception("Failed processing {} translation jobs", len(jobs))
             finally:
-                self.queue.task_done()
-
-    async def _process(self, job: TranslationJob) -> None:
-        async with self.bot.sessionmaker() as session:
-            glossary_entries = await crud.list_glossary_entries(session, job.guild_id)
-        spans_text, spans = extract_spans(job.content)
-        payload = TranslationPayload(
-            text=spans_text,
-            source_lang=job.source_lang,
-            target_lang=job.target_lang,
-            glossary=[(entry.term, entry.translation) for entry in glossary_entries] or None,
-        )
-        outcome = await self.bot.translators.translate(payload)
-        translated = outcome.text
-        if glossary_entries:
-            compiled = compile_glossary(glossary_entries)
-            translated = apply_glossary(translated, compiled)
-        translated = reinsert_spans(translated, spans, job.content)
-        translated = stitch_translation(job.reference_url, translated)
+                for _ in jobs:
+                    self.queue.task_done()
+
+    async def _collect_batch(self) -> list[TranslationJob]:
+        """Take the next job plus whatever else arrives within the batch window."""
+        jobs = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + BATCH_WINDOW
+        while len(jobs) < BATCH_SIZE:
+            if not self.queue.empty():
+                jobs.append(self.queue.get_nowait())
+                continue
+            # Give a burst a moment to arrive so it can share one translator request.
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                jobs.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except TimeoutError:
+                break
+        return jobs
+
+    async def _process_batch(
+        self,
+        jobs: list[TranslationJob],
+        turns: _ChannelTurns,
+    ) -> None:
+        try:
+            groups: dict[tuple[int, str, str], list[int]] = {}
+            for index, job in enumerate(jobs):
+                groups.setdefault((job.guild_id, job.source_lang, job.target_lang), []).append(index)
+            results: list[Optional[str]] = [None] * len(jobs)
+            await asyncio.gather(*(self._translate_group(jobs, indices, results) for indices in groups.values()))
+            for previous, _ in turns.values():
+                if previous is not None:
+                    await previous
+            # Deliver in arrival order so a channel's translations keep the order of its messages.
+            for job, translated in zip(jobs, results):
+                if translated is None:
+                    continue
+                try:
+                    await self._deliver(job, translated)
+                except Exception:
+                    logger.exception("Failed delivering translation job {}", job)
+        finally:
+            self._release_channels(turns)
+
+    def _claim_channels(
+        self,
+        jobs: list[TranslationJob],
+    ) -> _ChannelTurns:
+        """Queue this batch behind earlier batches for the same channels, in pickup order."""
+        loop = asyncio.get_running_loop()
+        turns: _ChannelTurns = {}
+        for channel_id in dict.fromkeys(job.channel_id for job in jobs):
+            turn = loop.create_future()
+            turns[channel_id] = (self._channel_turns.get(channel_id), turn)
+            self._channel_turns[channel_id] = turn
+        return turns
+
+    def _release_channels(
+        self,
+        turns: _ChannelTurns,
+    ) -> None:
+        for channel_id, (_, turn) in turns.items():
+            turn.set_result(None)
+            if self._channel_turns.get(channel_id) is turn:
+                del self._channel_turns[channel_id]
+
+    async def _translate_group(
+        self,
+        jobs: list[TranslationJob],
+        indices: list[int],
+        results: list[Optional[str]],
+    ) -> None:
+        """Translate jobs sharing a guild and language pair with a single translator call."""
+        first = jobs[indices[0]]
+        try:
+            glossary = self.bot.glossary_cache.get(first.guild_id)
+            if glossary is None:
+                glossary = await self.bot.glossary_cache.load(self.bot.sessionmaker, first.guild_id)
+            extracted = [extract_spans(jobs[index].content) for index in indices]
+            batch = BatchPayload(
+                texts=[spans_text for spans_text, _ in extracted],
+                source_lang=first.source_lang,
+                target_lang=first.target_lang,
+                glossary=glossary.pairs,
+            )
+            outcomes = await self.bot.translators.translate_batch(batch)
+        except Exception:
+            logger.exception("Failed translating {} jobs for guild {}", len(indices), first.guild_id)
+            return
+        for index, (_, spans), outcome in zip(indices, extracted, outcomes):
+            job = jobs[index]
+            translated = outcome.text
+            if glossary.entries:
+                translated = apply_glossary(translated, glossary.compiled)
+            try:
+                translated = reinsert_spans(translated, spans, job.content)
+            except SpanParsingError:
+                logger.exception("Failed restoring spans for translation job {}", job)
+                continue
+            results[index] = stitch_translation(job.reference_url, translated)
+
+    async def _deliver(self, job: TranslationJob, translated: str) -> None:
         message = await self._dispatch(job, translated)
         if message:
-            async with self.bot.sessionmaker() as session:
-                await crud.register_message_map(
-                    session,
-                    guild_id=job.guild_id,
-                    channel_id=job.channel_id,
-                    original_msg_id=job.message_id,
-                    translated_msg_id=message.id,
-                    dst_lang=job.target_lang,
-                    target_kind=job.target_kind,
-                )
+            assert self.bot.message_map_writer is not None
+            self.bot.message_map_writer.enqueue(
+                {
+                    "guild_id": job.guild_id,
+                    "channel_id": job.channel_id,
+                    "original_msg_id": job.message_id,
+                    "translated_msg_id": message.id,
+                    "dst_lang": job.target_lang,
+                    "target_kind": job.target_kind,
+                }
+            )
+
+    async def _resolve_channel(self, channel_id: int) -> Any:
+        channel = self.bot.get_channel(channel_id) or self._channel_cache.get(channel_id)
+        if channel is not None:
+            return channel
+        if self._missing_channels.get(channel_id):
+            return None
+        try:
+            channel = await self.bot.fetch_channel(channel_id)
+        except (discord.NotFound, discord.Forbidden):
+            # Deleted or hidden channels would otherwise cost an HTTP call for every job.
+            self._missing_channels.set(channel_id, True)
+            raise
+        self._channel_cache.set(channel_id, channel)
+        return channel
 
     async def _dispatch(self, job: TranslationJob, text: str) -> Optional[discord.Message]:
-        channel = self.bot.get_channel(job.channel_id)
+        try:
+            channel = await self._resolve_channel(job.channel_id)
+        except discord.HTTPException:
+            logger.warning("Unable to resolve channel {}", job.channel_id)
+            return None
         if channel is None:
-            try:
-                channel = await self.bot.fetch_channel(job.channel_id)
-            except discord.HTTPException:
-                logger.warning("Unable to resolve channel %s", job.channel_id)
-                return None
+            return None
         if job.target_kind == TargetKindEnum.inline and isinstance(channel, discord.TextChannel):
             content = sanitize_for_webhook(text)
             return await self._webhooks.send(
@@ -128,12 +295,8 @@ class TranslationWorker:
         return thread
 
 
-_worker_instance: Optional[TranslationWorker] = None
-
-
 def get_worker(bot: "ScribeBot") -> TranslationWorker:
-    global _worker_instance
-    if _worker_instance is None:
-        _worker_instance = TranslationWorker(bot)
-        _worker_instance.start()
-    return _worker_instance
+    if bot.worker is None:
+        bot.worker = TranslationWorker(bot)
+    bot.worker.start()
+    return bot.worker